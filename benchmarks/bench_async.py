@@ -0,0 +1,97 @@
+"""Measures the latency of small rewrites while large schemas are rewritten at the same time.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_async [--large 2] [--tables 1000] [--requests 100]
+
+`--large` rewrites of a large schema start together, then a small rewrite is requested
+every 10 ms, as an async gateway would. The baseline calls the blocking
+`RewriterSession.rewrite` from the handlers, the others `RewriterSession.arewrite`
+with a thread or a process executor.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.bench_parse import synthetic_schema
+from sql2shacl import RewriterSession
+
+SMALL_SQL = (
+    "CREATE TABLE Dept (id integer PRIMARY KEY, name varchar(20) NOT NULL UNIQUE);"
+    "CREATE TABLE Emp (id integer PRIMARY KEY, dept integer REFERENCES Dept (id));"
+)
+
+
+async def run(rewrite, large_sql: str, n_large: int, n_requests: int):
+    latencies = []
+
+    # latencies count from when a request is due, so that time spent
+    # in a blocked event loop before the request is issued counts as well
+    async def small_request(due: float):
+        await rewrite(SMALL_SQL)
+        latencies.append(time.perf_counter() - due)
+
+    start = time.perf_counter()
+    large = [asyncio.create_task(rewrite(large_sql)) for _ in range(n_large)]
+    small = []
+    for idx in range(n_requests):
+        due = start + idx * 0.01
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        small.append(asyncio.create_task(small_request(due)))
+
+    await asyncio.gather(*large, *small)
+    return latencies, time.perf_counter() - start
+
+
+def report(label: str, latencies, elapsed: float) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<18} small p50 {quantiles[49] * 1e3:8.1f} ms, "
+        f"p99 {quantiles[98] * 1e3:8.1f} ms, total {elapsed:6.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--large", type=int, default=2)
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    large_sql = synthetic_schema(args.tables, args.columns)
+    max_concurrency = args.large + 2
+
+    session = RewriterSession(log_level=None)
+
+    async def blocking(sql):
+        return session.rewrite(sql)
+
+    report(
+        "blocking rewrite",
+        *asyncio.run(run(blocking, large_sql, args.large, args.requests)),
+    )
+
+    session = RewriterSession(log_level=None, max_concurrency=max_concurrency)
+    report(
+        "arewrite threads",
+        *asyncio.run(run(session.arewrite, large_sql, args.large, args.requests)),
+    )
+    session.close()
+
+    with ProcessPoolExecutor(max_workers=max_concurrency) as executor:
+        session = RewriterSession(
+            log_level=None, executor=executor, max_concurrency=max_concurrency
+        )
+        report(
+            "arewrite processes",
+            *asyncio.run(run(session.arewrite, large_sql, args.large, args.requests)),
+        )
+
+
+if __name__ == "__main__":
+    main()
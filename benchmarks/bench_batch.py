@@ -0,0 +1,49 @@
+"""Measures how `rewrite_many` scales with worker processes on a batch of tenant schemas.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_batch [--scripts 200] [--tables 20] [--columns 12]
+
+The baseline is a Python loop over `sql2shacl.rewrite`.
+"""
+
+import argparse
+import logging
+import os
+import time
+import sql2shacl
+from benchmarks.bench_parse import synthetic_schema
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scripts", type=int, default=200)
+    parser.add_argument("--tables", type=int, default=20)
+    parser.add_argument("--columns", type=int, default=12)
+    args = parser.parse_args()
+
+    scripts = [synthetic_schema(args.tables, args.columns)] * args.scripts
+
+    start = time.perf_counter()
+    for sql in scripts:
+        sql2shacl.rewrite(sql, log_level=logging.ERROR)
+    baseline = time.perf_counter() - start
+    print(f"loop over rewrite   {baseline:7.3f}s")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        results = list(
+            sql2shacl.rewrite_many(scripts, workers=workers, log_level=logging.ERROR)
+        )
+        elapsed = time.perf_counter() - start
+        assert all(result.ok for result in results)
+
+        print(
+            f"rewrite_many {workers:>2} workers {elapsed:7.3f}s, x{baseline / elapsed:.2f}"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
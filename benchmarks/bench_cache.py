@@ -0,0 +1,41 @@
+"""Compares a cold rewrite with a warm one served from a `ResultCache`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_cache [--tables 2000] [--columns 12]
+
+Each run uses a fresh session on the same cache directory, as a CI job would.
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from benchmarks.bench_parse import synthetic_schema
+from sql2shacl import RewriterSession
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--columns", type=int, default=12)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    sql = synthetic_schema(args.tables, args.columns)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ("cold", "warm"):
+            start = time.perf_counter()
+            session = RewriterSession(log_level=None, cache=cache_dir)
+            session.rewrite(sql)
+            elapsed = time.perf_counter() - start
+
+            print(
+                f"{label} {args.tables} tables: {elapsed * 1e3:9.1f} ms "
+                f"({session.cache.hits} hits, {session.cache.misses} misses)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compares the shape delta of a small migration with a full rewrite of the new schema.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_delta [--tables 8000] [--columns 12] [--changed 3]
+
+The migration makes the first column nullable in of `--changed` tables spread over the schema.
+The delta is timed from both scripts, and from versions parsed beforehand.
+"""
+
+import argparse
+import logging
+import time
+import sql2shacl
+from benchmarks.bench_parse import synthetic_schema
+from sql2shacl.sql.ddl import DDL
+
+
+def migrate(sql: str, n_tables: int, n_changed: int) -> str:
+    for idx in range(0, n_tables, n_tables // n_changed)[:n_changed]:
+        statement = f"CREATE TABLE t_{idx} (\n    id integer PRIMARY KEY,\n"
+        sql = sql.replace(
+            statement + '    "col_0" varchar(10) NOT NULL',
+            statement + '    "col_0" varchar(10)',
+        )
+
+    return sql
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=8000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--changed", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    old_sql = synthetic_schema(args.tables, args.columns)
+    new_sql = migrate(old_sql, args.tables, args.changed)
+
+    start = time.perf_counter()
+    sql2shacl.rewrite(new_sql, format="nt")
+    full = time.perf_counter() - start
+
+    print(f"full rewrite {args.tables} tables: {full * 1e3:9.1f} ms")
+
+    runs = (
+        ("both scripts", lambda: (old_sql, new_sql)),
+        ("old version parsed", lambda: (DDL(old_sql), new_sql)),
+        ("both versions parsed", lambda: (DDL(old_sql), DDL(new_sql))),
+    )
+    for label, versions in runs:
+        old, new = versions()
+        start = time.perf_counter()
+        delta = sql2shacl.diff(old, new)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"delta from {label}: {elapsed * 1e3:9.1f} ms "
+            f"({len(delta.reshaped)} reshaped, {len(delta.removed)} removed, "
+            f"{len(delta.added)} added)"
+        )
+
+
+if __name__ == "__main__":
+    main()
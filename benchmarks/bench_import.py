@@ -0,0 +1,58 @@
+"""Measures the cold import cost of `python -m sql2shacl --help`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import [--repeat 5]
+
+The import times are taken from `python -X importtime`, which reports
+the cumulative time of every top-level import in microseconds.
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict
+
+HEAVY_MODULES = ("rdflib", "sqlparse", "sql2shacl.constraint_rewriter")
+
+
+def import_times(*args: str) -> Dict[str, int]:
+    """Returns the cumulative import time in microseconds per module imported by `args`."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.repeat):
+        times = import_times("-m", "sql2shacl", "--help")
+        total = times["sql2shacl"] + times["sql2shacl.cli"]
+        best = total if best is None else min(best, total)
+
+    heavy = [name for name in HEAVY_MODULES if name in times]
+    print(f"sql2shacl --help imports in {best / 1000:.1f}ms")
+    print(f"heavy modules imported: {', '.join(heavy) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Micro-benchmark of the IRI builders with the call pattern of `Shaper`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_iri_builder [--tables 2000] [--columns 12] [--repeat 3]
+
+Each column asks for its class, attribute and datatype IRI, and each table for
+a foreign key IRI and the class IRIs on both ends, as shaping a schema does.
+Every builder is timed without its IRI cache (`cache_size=0`) and with the
+default cache.
+"""
+
+import argparse
+from benchmarks.bench_parse import best_of
+from sql2shacl.shacl.iri_builder import SequedaBuilder, W3CBuilder
+
+
+def build_iris(builder, n_tables: int, n_columns: int) -> None:
+    for idx in range(n_tables):
+        rel_name = f"t_{idx}"
+        referenced_name = f"t_{idx - 1}"
+
+        for col in range(n_columns):
+            col_name = f"col_{col}"
+            builder.build_class_iri(rel_name)
+            builder.build_attribute_iri(rel_name, col_name)
+            builder.build_datatype_iri("varchar")
+
+        builder.build_class_iri(rel_name)
+        builder.build_class_iri(referenced_name)
+        builder.build_foreign_key_iri(rel_name, referenced_name, ["parent"], ["id"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    n_calls = args.tables * (3 * args.columns + 3)
+
+    for builder_cls in (W3CBuilder, SequedaBuilder):
+        uncached = best_of(
+            args.repeat,
+            lambda: build_iris(
+                builder_cls("http://example.com/base/", cache_size=0),
+                args.tables,
+                args.columns,
+            ),
+        )
+        cached = best_of(
+            args.repeat,
+            lambda: build_iris(
+                builder_cls("http://example.com/base/"), args.tables, args.columns
+            ),
+        )
+        print(
+            f"{builder_cls.__name__:<15} {n_calls} calls   "
+            f"uncached {uncached:6.3f}s   cached {cached:6.3f}s   "
+            f"x{uncached / cached:4.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
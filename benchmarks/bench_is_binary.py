@@ -0,0 +1,86 @@
+"""Micro-benchmark of `Relation.is_binary` over wide schemas.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_is_binary [--tables 2000] [--columns 200] [--repeat 5]
+"""
+
+import argparse
+import time
+from sql2shacl.sql.ddl import DDL
+from sql2shacl.sql.record import (
+    ColumnRecord,
+    ConstraintRecord,
+    ReferenceRecord,
+    RelationRecord,
+)
+
+
+def wide_schema_records(n_tables: int, n_columns: int):
+    """Returns wide tables, each with column and table foreign keys to its predecessor."""
+
+    records = []
+    for idx in range(n_tables):
+        columns = [ColumnRecord("id", "integer", True, True, None)]
+        columns += [
+            ColumnRecord(
+                f"col_{col}",
+                "integer",
+                False,
+                False,
+                ReferenceRecord("", f"t_{idx - 1}", "id") if col % 10 == 0 else None,
+            )
+            for col in range(n_columns)
+        ]
+        constraints = [
+            ConstraintRecord(
+                "FOREIGN KEY", "", (f"col_{col}",), f"t_{idx - 1}", ("id",)
+            )
+            for col in range(1, n_columns, 10)
+        ]
+        constraints.append(ConstraintRecord("UNIQUE", "", ("col_1", "col_2")))
+        records.append(RelationRecord(f"t_{idx}", tuple(columns), tuple(constraints)))
+
+    # binary relations with exactly two referencing columns reach every check
+    for idx in range(n_tables):
+        records.append(
+            RelationRecord(
+                f"link_{idx}",
+                (
+                    ColumnRecord(
+                        "a", "integer", False, False, ReferenceRecord("", "t_0", "id")
+                    ),
+                    ColumnRecord(
+                        "b", "integer", False, False, ReferenceRecord("", "t_1", "id")
+                    ),
+                ),
+                (ConstraintRecord("PRIMARY KEY", "", ("a", "b")),),
+            )
+        )
+
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--columns", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ddl = DDL.from_records(wide_schema_records(args.tables, args.columns))
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        n_binary = sum(rel.is_binary() for rel in ddl.relations)
+        timings.append(time.perf_counter() - start)
+
+    print(
+        f"{len(ddl.relations)} relations, {n_binary} binary: "
+        f"first pass {timings[0]:.3f}s, best pass {min(timings):.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
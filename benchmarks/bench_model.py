@@ -0,0 +1,53 @@
+"""Compares parsing a SQL script with loading its saved schema model.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_model [--tables 20000] [--columns 12]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from benchmarks.bench_parse import synthetic_schema
+from sql2shacl.sql.ddl import DDL
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=20000)
+    parser.add_argument("--columns", type=int, default=12)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    sql = synthetic_schema(args.tables, args.columns)
+
+    start = time.perf_counter()
+    ddl = DDL(sql)
+    parse = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_file = os.path.join(tmp_dir, "schema.model")
+
+        start = time.perf_counter()
+        ddl.save(model_file)
+        save = time.perf_counter() - start
+
+        start = time.perf_counter()
+        DDL.load(model_file)
+        load = time.perf_counter() - start
+
+        size = os.path.getsize(model_file)
+
+    print(
+        f"parse {args.tables} tables: {parse * 1e3:9.1f} ms ({len(sql) >> 20} MiB SQL)"
+    )
+    print(f"save model:       {save * 1e3:9.1f} ms ({size >> 20} MiB)")
+    print(
+        f"load model:       {load * 1e3:9.1f} ms (x{parse / load:.1f} faster than parsing)"
+    )
+
+
+if __name__ == "__main__":
+    main()
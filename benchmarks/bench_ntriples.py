@@ -0,0 +1,58 @@
+"""Compares writing Turtle through the shapes graph with streaming N-Triples.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ntriples [--tables 2000] [--columns 12]
+
+Both modes write to a temporary file. Peak memory is traced with `tracemalloc`
+in a second pass, since tracing slows down the timed pass.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from benchmarks.bench_parse import synthetic_schema
+from sql2shacl.constraint_rewriter import ConstraintRewriter
+
+
+def write_shapes(sql: str, format: str, path: str) -> None:
+    rewriter = ConstraintRewriter.setup(sql)
+    if format != "nt":
+        rewriter.rewrite()
+
+    rewriter.serialize_shapes(format=format, destination=path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--columns", type=int, default=12)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    sql = synthetic_schema(args.tables, args.columns)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for format in ("ttl", "nt"):
+            path = os.path.join(tmp_dir, f"shapes.{format}")
+
+            start = time.perf_counter()
+            write_shapes(sql, format, path)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            write_shapes(sql, format, path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(
+                f"{format:<4} {args.tables} tables: {elapsed:7.3f}s, "
+                f"peak {peak / 2**20:7.1f} MiB, {os.path.getsize(path) / 2**20:.1f} MiB written"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Measures how parsing a large schema scales with worker processes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parallel [--tables 20000] [--columns 12]
+"""
+
+import argparse
+import logging
+import os
+import time
+from benchmarks.bench_parse import synthetic_schema
+from sql2shacl.sql.ddl import DDL
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=20000)
+    parser.add_argument("--columns", type=int, default=12)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    sql = synthetic_schema(args.tables, args.columns)
+
+    workers = 1
+    baseline = None
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        ddl = DDL(sql, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+
+        print(
+            f"workers={workers:<3} relations={len(ddl.relations):<7} "
+            f"{elapsed:8.3f}s   speedup x{baseline / elapsed:5.2f}"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compares the fast-path DDL parser with the sqlparse path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parse [--tables 2000] [--columns 12] [--repeat 3]
+"""
+
+import argparse
+import glob
+import logging
+import time
+from sql2shacl.sql.ddl import DDL
+
+
+def synthetic_schema(n_tables: int, n_columns: int) -> str:
+    statements = []
+    for idx in range(n_tables):
+        columns = ",\n".join(
+            f'    "col_{col}" varchar({col + 10}) NOT NULL' for col in range(n_columns)
+        )
+        ref = f",\n    parent integer REFERENCES t_{idx - 1} (id)" if idx else ""
+        statements.append(
+            f"CREATE TABLE t_{idx} (\n    id integer PRIMARY KEY,\n{columns}{ref},\n"
+            f'    UNIQUE ("col_0", "col_1")\n);\n'
+            f"CREATE INDEX t_{idx}_idx ON t_{idx} (id);\n"
+            f"COMMENT ON TABLE t_{idx} IS 'table {idx}';"
+        )
+
+    return "\n".join(statements)
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def compare(label: str, scripts, repeat: int) -> None:
+    def run(fast_path):
+        return lambda: [DDL(sql, fast_path=fast_path) for sql in scripts]
+
+    slow = best_of(repeat, run(False))
+    fast = best_of(repeat, run(True))
+    print(
+        f"{label:<28} sqlparse {slow:8.3f}s   fast path {fast:8.3f}s   x{slow / fast:5.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    corpus = []
+    for path in sorted(glob.glob("testcases/*/create.sql")):
+        with open(path, encoding="utf-8") as f:
+            corpus.append(f.read())
+
+    compare("testcases/ corpus", corpus, args.repeat)
+    compare(
+        f"synthetic {args.tables}x{args.columns}",
+        [synthetic_schema(args.tables, args.columns)],
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Compares the per-call cost of `sql2shacl.rewrite` with a reused `RewriterSession`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_session [--calls 500]
+"""
+
+import argparse
+import time
+import sql2shacl
+from sql2shacl import RewriterSession
+
+SQL = """
+CREATE TABLE Dept (id integer PRIMARY KEY, name varchar(20) NOT NULL UNIQUE);
+CREATE TABLE Emp (
+    id integer PRIMARY KEY,
+    name varchar(20),
+    dept integer REFERENCES Dept (id)
+);
+"""
+
+
+def per_call(calls: int, func) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    one_off = per_call(args.calls, lambda: sql2shacl.rewrite(SQL))
+    session = RewriterSession()
+    reused = per_call(args.calls, lambda: session.rewrite(SQL))
+
+    print(
+        f"sql2shacl.rewrite {one_off * 1e3:.3f} ms per call, "
+        f"RewriterSession.rewrite {reused * 1e3:.3f} ms per call"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Measures the shaping phase, i.e. rewriting an already parsed schema into SHACL triples.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_shaping [--tables 10000] [--columns 12] [--repeat 3]
+"""
+
+import argparse
+import logging
+from benchmarks.bench_parse import best_of, synthetic_schema
+from sql2shacl.constraint_rewriter import ConstraintRewriter
+from sql2shacl.shacl.triple_buffer import TripleBuffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=10000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    sql = synthetic_schema(args.tables, args.columns)
+
+    for mode in ("w3c", "thapa"):
+        rewriter = ConstraintRewriter.setup(sql, mode=mode)
+
+        def shape():
+            rewriter.shapes = TripleBuffer()
+            rewriter.rewrite()
+
+        elapsed = best_of(args.repeat, shape)
+        print(
+            f"{mode:<6} {args.tables} tables: {len(rewriter.shapes)} triples "
+            f"in {elapsed:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compares the memory per triple of an rdflib `Graph` and a `TripleBuffer` as shapes store.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_store [--tables 2000] [--columns 12]
+
+The memory held by each store after shaping is traced with `tracemalloc`,
+starting from an already parsed schema.
+"""
+
+import argparse
+import gc
+import logging
+import time
+import tracemalloc
+from rdflib import Graph
+from benchmarks.bench_parse import synthetic_schema
+from sql2shacl.constraint_rewriter import ConstraintRewriter
+from sql2shacl.shacl.shacl_shaper import Shaper
+from sql2shacl.shacl.triple_buffer import TripleBuffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--columns", type=int, default=12)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rewriter = ConstraintRewriter.setup(synthetic_schema(args.tables, args.columns))
+
+    for store_cls in (Graph, TripleBuffer):
+        start = time.perf_counter()
+        Shaper(rewriter.iri_builder, rewriter.ddl_manager, store_cls()).shape_up()
+        elapsed = time.perf_counter() - start
+
+        gc.collect()
+        tracemalloc.start()
+        store = store_cls()
+        Shaper(rewriter.iri_builder, rewriter.ddl_manager, store).shape_up()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(
+            f"{store_cls.__name__:<12} {len(store)} triples in {elapsed:.3f}s: "
+            f"{current / len(store):6.0f} bytes per triple, "
+            f"held {current / 2**20:.1f} MiB, peak {peak / 2**20:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
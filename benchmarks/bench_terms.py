@@ -0,0 +1,62 @@
+"""Measures how many term objects the shapes of a large schema are made of.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_terms [--tables 4000] [--columns 12]
+
+The shapes are collected in a plain list, as streaming sinks keep them until a flush,
+and the memory held by the list is traced with `tracemalloc`. Term objects counts
+every distinct object among the subjects, predicates and objects; terms counts equal
+terms once.
+"""
+
+import argparse
+import gc
+import logging
+import time
+import tracemalloc
+from benchmarks.bench_parse import synthetic_schema
+from sql2shacl.constraint_rewriter import ConstraintRewriter
+from sql2shacl.shacl.shacl_shaper import Shaper
+
+
+class ListSink:
+    def __init__(self):
+        self.triples = []
+
+    def addN(self, quads):
+        self.triples.extend((s, p, o) for s, p, o, _ in quads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=4000)
+    parser.add_argument("--columns", type=int, default=12)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    sql = synthetic_schema(args.tables, args.columns)
+
+    for mode in ("w3c", "thapa"):
+        rewriter = ConstraintRewriter.setup(sql, mode=mode)
+
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        sink = ListSink()
+        Shaper(rewriter.iri_builder, rewriter.ddl_manager, sink).shape_up()
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        terms = [term for triple in sink.triples for term in triple]
+        print(
+            f"{mode:<6} {len(sink.triples)} triples in {elapsed:.3f}s: "
+            f"{len({id(term) for term in terms})} term objects for {len(set(terms))} terms, "
+            f"held {current / 2**20:.1f} MiB, peak {peak / 2**20:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -18,30 +18,85 @@ limitations under the License.
 """Rewrite SQL constraints to SHACL shapes"""
 
 import logging
-import sql2shacl.constraint_rewriter as cr
-from sql2shacl.utils import logging as cr_logging
-from sql2shacl.utils import exceptions
+from importlib import import_module
+from typing import TYPE_CHECKING, Optional, TextIO, Union
+
+if TYPE_CHECKING:
+    from .sql.ddl import DDL
 
 __version__ = "v1.0.0"
-__all__ = ["cr", "cr_logging", "exceptions"]
+__all__ = [
+    "cr",
+    "cr_logging",
+    "exceptions",
+    "ResultCache",
+    "RewriterSession",
+    "RewriteResult",
+    "ShapeDelta",
+    "arewrite",
+    "diff",
+    "rewrite",
+    "rewrite_many",
+]
+
+# submodules are imported on first access, so that e.g. `sql2shacl --help`
+# does not import rdflib and sqlparse
+_LAZY_SUBMODULES = {
+    "cr": "sql2shacl.constraint_rewriter",
+    "cr_logging": "sql2shacl.utils.logging",
+    "exceptions": "sql2shacl.utils.exceptions",
+}
+_LAZY_ATTRIBUTES = {
+    "RewriterSession": "sql2shacl.session",
+    "arewrite": "sql2shacl.session",
+    "RewriteResult": "sql2shacl.batch",
+    "ResultCache": "sql2shacl.cache",
+    "ShapeDelta": "sql2shacl.delta",
+    "diff": "sql2shacl.delta",
+    "rewrite_many": "sql2shacl.batch",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_SUBMODULES:
+        module = import_module(_LAZY_SUBMODULES[name])
+        globals()[name] = module
+        return module
+
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_SUBMODULES) + list(_LAZY_ATTRIBUTES))
 
 
 def rewrite(
-    sql: str,
+    sql: Union[str, TextIO, "DDL"],
     base_iri: str = "http://example.org/base/",
     mode: str = "w3c",
     log_level: int = logging.WARNING,
     log_file: str = None,
-) -> str:
+    workers: int = 1,
+    format: str = "ttl",
+    destination: Union[str, TextIO, None] = None,
+    cache: Optional[str] = None,
+) -> Optional[str]:
+    """Rewrites `sql` in a one-off `RewriterSession`, see there for `cache`.
 
-    cr_logging.setup_logging(log_level, log_file)
-    logger = logging.getLogger(__name__)
+    `sql` is a script or a `DDL`, e.g. loaded from a model file by `DDL.load`.
 
-    try:
-        rewriter = cr.ConstraintRewriter.setup(sql, base_iri, mode)
-        rewriter.rewrite()
+    Callers that rewrite many scripts with the same settings should keep a
+    `RewriterSession` instead, which sets up logging and resources only once.
+    """
 
-    except exceptions.MissingSQLDatatypeException:
-        logger.error("It seems there are missing data types in the column definitions")
+    from .session import RewriterSession
 
-    return rewriter.serialize_shapes()
+    session = RewriterSession(
+        base_iri, mode, log_level, log_file, workers, format, cache=cache
+    )
+    return session.rewrite(sql, destination=destination)
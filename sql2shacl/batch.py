@@ -0,0 +1,170 @@
+"""
+Copyright 2024 Lukas Kubelka and Xuemin Duan
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, TextIO, Tuple, Union
+from .session import RewriterSession
+
+logger = logging.getLogger(__name__)
+
+# the session of a worker process, created once by `_init_worker`
+_worker_session: Optional[RewriterSession] = None
+
+
+class RewriteResult(NamedTuple):
+    """Outcome of rewriting the script at `index`, either its shapes or its error."""
+
+    index: int
+    shapes: Optional[str]
+    error: Optional[BaseException]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _init_worker(*session_args) -> None:
+    global _worker_session
+    _worker_session = RewriterSession(*session_args)
+
+
+def _rewrite_in_worker(sql: str) -> str:
+    return _worker_session.rewrite(sql)
+
+
+def _failed(index: int, error: BaseException) -> RewriteResult:
+    logger.error(f"Rewriting script {index} failed: {error!r}")
+    return RewriteResult(index, None, error)
+
+
+def _read(sql: Union[str, TextIO]) -> str:
+    # streams cannot be sent to worker processes
+    return sql if isinstance(sql, str) else sql.read()
+
+
+def _result(index: int, future: Future) -> RewriteResult:
+    try:
+        return RewriteResult(index, future.result(), None)
+
+    except Exception as e:
+        return _failed(index, e)
+
+
+def _submit(
+    executor: ProcessPoolExecutor, pending: Dict[Future, int], index: int, sql: str
+) -> Optional[BrokenProcessPool]:
+    """Submits the script at `index` into `pending`, returns the error if the pool broke."""
+
+    try:
+        pending[executor.submit(_rewrite_in_worker, sql)] = index
+
+    except BrokenProcessPool as e:
+        return e
+
+    return None
+
+
+def rewrite_many(
+    scripts: Iterable[Union[str, TextIO]],
+    workers: Optional[int] = None,
+    base_iri: str = "http://example.org/base/",
+    mode: str = "w3c",
+    log_level: Optional[int] = logging.WARNING,
+    log_file: str = None,
+    format: str = "ttl",
+    ordered: bool = True,
+) -> Iterator[RewriteResult]:
+    """Rewrites each of `scripts` and yields a `RewriteResult` per script.
+
+    The scripts are fanned out to a pool of `workers` processes, one per CPU by default.
+    Each worker sets up a `RewriterSession` once, so modules, the datatype map and the
+    unique values constraint component are loaded before the first script arrives.
+    With `ordered`, results are yielded in the order of `scripts`, otherwise as soon
+    as they complete. A failing script is reported in its result and does not abort
+    the batch. If a worker process dies, e.g. killed for running out of memory, the pool
+    is broken, and the scripts in flight and all scripts left are reported as failed
+    with a `BrokenProcessPool` error.
+
+    `scripts` is consumed lazily, and at most two scripts per worker are submitted
+    to the pool at a time, so a large batch is never held in memory at once.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    session_args = (base_iri, mode, log_level, log_file, 1, format)
+    indexed_scripts = enumerate(map(_read, scripts))
+    window = list(islice(indexed_scripts, 2 * workers))
+
+    if workers == 1 or len(window) <= 1:
+        session = RewriterSession(*session_args)
+        for index, sql in chain(window, indexed_scripts):
+            try:
+                result = RewriteResult(index, session.rewrite(sql), None)
+
+            except Exception as e:
+                result = _failed(index, e)
+
+            yield result
+
+        return
+
+    logger.info(f"Rewriting scripts with {workers} worker processes")
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(window)),
+        initializer=_init_worker,
+        initargs=session_args,
+    ) as executor:
+        scripts_left = chain(window, indexed_scripts)
+        # futures in the order they were submitted
+        pending: Dict[Future, int] = {}
+        # the first script that could not be submitted since the pool broke
+        broken: Optional[Tuple[int, BrokenProcessPool]] = None
+
+        for index, sql in islice(scripts_left, len(window)):
+            error = _submit(executor, pending, index, sql)
+            if error is not None:
+                broken = (index, error)
+                break
+
+        while pending:
+            if ordered:
+                done = [next(iter(pending))]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                result = _result(pending.pop(future), future)
+
+                # the next script is submitted before the result is handed out,
+                # so the workers stay busy while the caller processes it
+                if broken is None:
+                    for index, sql in islice(scripts_left, 1):
+                        error = _submit(executor, pending, index, sql)
+                        if error is not None:
+                            broken = (index, error)
+
+                yield result
+
+        if broken is not None:
+            index, error = broken
+            yield _failed(index, error)
+            for index, _ in scripts_left:
+                yield _failed(index, error)
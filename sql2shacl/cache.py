@@ -0,0 +1,182 @@
+"""
+Copyright 2024 Lukas Kubelka and Xuemin Duan
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# quoted identifiers, string literals and comments, with the line break ending a line
+# comment, are kept as they are. Any other run of whitespace is collapsed, so that
+# reformatting a script does not miss the cache. Single spaces are left alone.
+_SQL_CHUNK_REGEX = re.compile(
+    r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|--[^\r\n]*(?:\r?\n)?|/\*.*?\*/)|(\s\s+|[^\S ])""",
+    re.DOTALL,
+)
+
+_ENTRY_SUFFIX = ".shapes"
+
+
+def _normalize_chunk(match: re.Match) -> str:
+    kept = match.group(1)
+    if kept is None:
+        return " "
+
+    # the line break ending a line comment is kept, but its style is not
+    if kept.startswith("--") and kept.endswith("\r\n"):
+        return kept[:-2] + "\n"
+
+    return kept
+
+
+def normalize_sql(sql: str) -> str:
+    """Returns `sql` with whitespace outside of quotes collapsed to single spaces."""
+
+    # whether a backslash escapes a quote, and so where a literal ends, depends on the
+    # dialect, so such scripts are only stripped rather than risk merging two scripts
+    if "\\" in sql:
+        return sql.strip()
+
+    return _SQL_CHUNK_REGEX.sub(_normalize_chunk, sql).strip()
+
+
+class ResultCache:
+    """Content-addressed cache of serialized shapes in a directory.
+
+    An entry is keyed on the SHA-256 of the normalized SQL script, the mode, the base IRI,
+    the format and the version of sql2shacl, so a new release never reads stale shapes.
+    Entries are written to a temporary file first and then renamed, so readers see either
+    a whole entry or none. When the entries exceed `max_bytes`, the least recently used
+    ones are removed. `hits` and `misses` count the lookups of this instance.
+
+    The size of the entries is tracked while writing them, so the directory is only
+    scanned on the first write and whenever the tracked size exceeds `max_bytes`.
+    Entries written by other processes sharing the directory are counted at the next scan.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(sql: str, mode: str, base_iri: str, format: str) -> str:
+        from . import __version__
+
+        digest = hashlib.sha256()
+        for part in (__version__, mode, base_iri, format, normalize_sql(sql)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the shapes stored under `key`, or None."""
+
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8", newline="") as f:
+                shapes = f.read()
+
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # the modification time tracks the last use of an entry
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+        return shapes
+
+    def put(self, key: str, shapes: str) -> None:
+        """Stores `shapes` under `key`, replacing an existing entry atomically."""
+
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                f.write(shapes)
+                f.flush()
+                size = os.fstat(f.fileno()).st_size
+
+            try:
+                replaced_size = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced_size = 0
+
+            os.replace(tmp_path, path)
+
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += size - replaced_size
+
+            scan = self._total_bytes is None or self._total_bytes > self.max_bytes
+
+        if scan:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Scans the entries and removes the least recently used ones beyond `max_bytes`."""
+
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(_ENTRY_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+            logger.info(f"Evicted {os.path.basename(path)} from the result cache")
+            total -= size
+
+        with self._lock:
+            self._total_bytes = total
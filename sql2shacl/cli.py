@@ -15,10 +15,13 @@ limitations under the License.
 
 """
 
+import os
 import sql2shacl
+import stat
 import sys
 import argparse
 import logging
+import tempfile
 from io import TextIOWrapper
 
 
@@ -27,9 +30,11 @@ def create_parser():
         prog="sql2shacl",
         description="Rewrite SQL constraints in FILE according to OPTIONS",
         usage="%(prog)s  [OPTIONS] FILE, ...",
+        epilog="See '%(prog)s diff --help' for the shape delta between two SQL scripts. "
+        "A FILE named diff is given as ./diff",
     )
 
-    parser.add_argument("filename")
+    parser.add_argument("filename", nargs="?")
 
     parser.add_argument(
         "--base-iri",
@@ -56,6 +61,45 @@ def create_parser():
         help="write output to OUTFILE",
     )
 
+    parser.add_argument(
+        "--format",
+        dest="format",
+        metavar="FORMAT",
+        default="ttl",
+        choices=["ttl", "nt"],
+        help="output format, 'nt' streams N-Triples per relation (defaults to 'ttl')",
+    )
+
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        metavar="N",
+        type=int,
+        default=1,
+        help="parse the SQL script in N worker processes (defaults to 1)",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        metavar="DIR",
+        help="reuse the shapes of SQL scripts rewritten before with the same options, cached in DIR",
+    )
+
+    parser.add_argument(
+        "--save-model",
+        dest="save_model",
+        metavar="MODEL",
+        help="save the parsed schema model to MODEL, to be rewritten again with --model",
+    )
+
+    parser.add_argument(
+        "--model",
+        dest="model",
+        metavar="MODEL",
+        help="rewrite the schema model saved to MODEL instead of parsing FILE",
+    )
+
     parser.add_argument(
         "--loglevel",
         dest="loglevel",
@@ -69,6 +113,53 @@ def create_parser():
     return parser
 
 
+def create_diff_parser():
+    parser = argparse.ArgumentParser(
+        prog="sql2shacl diff",
+        description="Write the shape delta between the SQL scripts OLD and NEW as an RDF Patch",
+        usage="%(prog)s  [OPTIONS] OLD NEW",
+    )
+
+    parser.add_argument("old_filename", metavar="OLD")
+    parser.add_argument("new_filename", metavar="NEW")
+
+    parser.add_argument(
+        "--base-iri",
+        dest="iri",
+        metavar="IRI",
+        default="http://example.com/base/",
+        help="used as the IRI prefix (defaults to 'http://example.com/base/')",
+    )
+
+    parser.add_argument(
+        "--mode",
+        dest="mode",
+        metavar="MODE",
+        default="w3c",
+        choices=["w3c", "thapa"],
+        help="direct mapping assumptions based on which shacl shapes are generated (defaults to 'w3c)",
+    )
+
+    parser.add_argument(
+        "-o",
+        "--outfile",
+        dest="outfile",
+        metavar="OUTFILE",
+        help="write the RDF Patch to OUTFILE",
+    )
+
+    parser.add_argument(
+        "--loglevel",
+        dest="loglevel",
+        metavar="LOGLEVEL",
+        default="WARNING",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="set loglevel (defaults to logging.WARNING)",
+    )
+
+    return parser
+
+
 def _error(msg):
     """Print msg and optionally exit with return code exit_."""
 
@@ -77,11 +168,110 @@ def _error(msg):
     return 1
 
 
+def diff_main(args=None):
+    args = create_diff_parser().parse_args(args)
+
+    scripts = []
+    for filename in (args.old_filename, args.new_filename):
+        try:
+            with open(filename, encoding="utf-8") as f:
+                scripts.append(f.read())
+        except OSError as e:
+            return _error(f"Failed to read {filename}: {e}")
+
+    sql2shacl.cr_logging.setup_logging(getattr(logging, args.loglevel))
+
+    try:
+        delta = sql2shacl.diff(*scripts, base_iri=args.iri, mode=args.mode)
+
+    except (
+        sql2shacl.exceptions.MissingSQLDatatypeException,
+        sql2shacl.exceptions.UnsupportedSQLDatatypeException,
+    ) as e:
+        return _error(
+            f"Failed to diff {args.old_filename} and {args.new_filename}: {e}"
+        )
+
+    if args.outfile:
+        try:
+            with open(args.outfile, "w", encoding="utf-8") as f:
+                f.write(delta.to_rdf_patch())
+        except OSError as e:
+            return _error(f"Failed to write {args.outfile}: {e}")
+
+    else:
+        sys.stdout.write(delta.to_rdf_patch())
+
+    return 0
+
+
+def _rewrite_to(stream, data, args, loglevel):
+    """Writes the shapes of `data` to `stream`, returns the exit code."""
+
+    try:
+        if args.format == "nt":
+            sql2shacl.rewrite(
+                sql=data,
+                base_iri=args.iri,
+                mode=args.mode,
+                log_level=loglevel,
+                workers=args.workers,
+                format="nt",
+                destination=stream,
+                cache=args.cache_dir,
+            )
+
+        else:
+            shapes_graph = sql2shacl.rewrite(
+                sql=data,
+                base_iri=args.iri,
+                mode=args.mode,
+                log_level=loglevel,
+                workers=args.workers,
+                cache=args.cache_dir,
+            )
+            stream.write(shapes_graph)
+
+        stream.flush()
+
+    except (
+        sql2shacl.exceptions.MissingSQLDatatypeException,
+        sql2shacl.exceptions.UnsupportedSQLDatatypeException,
+    ) as e:
+        return _error(f"Failed to rewrite {args.filename or args.model}: {e}")
+
+    except BrokenPipeError:
+        # the reader went away, e.g. `sql2shacl --format nt FILE | head`
+        # so redirect stdout to devnull to avoid another BrokenPipeError at shutdown
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+    return 0
+
+
 def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    # `diff` is the only subcommand, so that `sql2shacl FILE` keeps working as it is,
+    # and a file named diff is rewritten by passing it as ./diff
+    if args and args[0] == "diff":
+        return diff_main(args[1:])
+
     parser = create_parser()
     args = parser.parse_args(args)
 
-    if args.filename == "-":  # read from stdin
+    if (args.filename is None) == (args.model is None):
+        parser.error("either FILE or --model MODEL is required")
+
+    if args.model and args.save_model:
+        parser.error("--save-model cannot be used with --model")
+
+    if args.model:
+        data = None
+
+    elif args.filename == "-":  # read from stdin
         wrapper = TextIOWrapper(sys.stdin.buffer)
         try:
             data = wrapper.read()
@@ -109,25 +299,95 @@ def main(args=None):
     else:
         loglevel = logging.WARNING
 
-    close_stream = False
-    if args.outfile:
+    if args.model or args.save_model:
+        from sql2shacl.sql.ddl import DDL
+
+        sql2shacl.cr_logging.setup_logging(loglevel)
+
+        try:
+            # a schema model is rewritten as it is, without parsing any SQL
+            if args.model:
+                data = DDL.load(args.model)
+
+            else:
+                data = DDL(data, workers=args.workers)
+                data.save(args.save_model)
+
+        except (
+            sql2shacl.exceptions.MissingSQLDatatypeException,
+            sql2shacl.exceptions.UnsupportedSQLDatatypeException,
+            sql2shacl.exceptions.UnsupportedModelException,
+            OSError,
+        ) as e:
+            if args.model:
+                return _error(f"Failed to load {args.model}: {e}")
+
+            return _error(f"Failed to save the model of {args.filename}: {e}")
+
+    if not args.outfile:
+        return _rewrite_to(sys.stdout, data, args, loglevel)
+
+    return _rewrite_to_outfile(data, args, loglevel)
+
+
+def _rewrite_to_outfile(data, args, loglevel):
+    """Writes the shapes of `data` to OUTFILE, returns the exit code.
+
+    The shapes are written to a temporary file next to OUTFILE, which replaces OUTFILE
+    only if the rewrite succeeded, so a failed rewrite leaves an existing OUTFILE as it is
+    and no new one behind. An OUTFILE that is not a regular file, e.g. /dev/null or a named
+    pipe, is written to directly.
+    """
+
+    target = os.path.realpath(args.outfile)
+
+    if os.path.exists(target) and not os.path.isfile(target):
         try:
-            stream = open(args.outfile, "w", encoding="utf-8")
-            close_stream = True
+            stream = open(target, "w", encoding="utf-8")
         except OSError as e:
             return _error(f"Failed to open {args.outfile}: {e}")
 
-    else:
-        stream = sys.stdout
+        with stream:
+            return _rewrite_to(stream, data, args, loglevel)
 
-    shapes_graph = sql2shacl.rewrite(
-        sql=data, base_iri=args.iri, mode=args.mode, log_level=loglevel
-    )
+    try:
+        stream = tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=os.path.dirname(target),
+            prefix=f".{os.path.basename(target)}.",
+            suffix=".tmp",
+            delete=False,
+        )
+    except OSError as e:
+        return _error(f"Failed to open {args.outfile}: {e}")
 
-    stream.write(shapes_graph)
-    stream.flush()
+    exit_code = 1
+    try:
+        with stream:
+            exit_code = _rewrite_to(stream, data, args, loglevel)
 
-    if close_stream:
-        stream.close()
+        if not exit_code:
+            os.chmod(stream.name, _file_mode(target))
+            os.replace(stream.name, target)
 
-    return 0
+    except OSError as e:
+        exit_code = _error(f"Failed to write {args.outfile}: {e}")
+
+    finally:
+        if exit_code:
+            os.unlink(stream.name)
+
+    return exit_code
+
+
+def _file_mode(path):
+    """Returns the permission bits of `path`, or those of a new file if it does not exist."""
+
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
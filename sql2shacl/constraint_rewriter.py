@@ -16,48 +16,96 @@ limitations under the License.
 """
 
 import logging
-from typing import Dict, List
+from io import StringIO
+from typing import Dict, List, Optional, TextIO, Union
 from pprint import pprint
 from rdflib import Graph
+from rdflib.namespace import RDF, RDFS, SH, XSD
 from sqlparse.sql import Token
 from .sql.ddl import DDL
 from .shacl.shacl_shaper import Shaper
 from .shacl.shacl_provider import UQ
+from .shacl.ntriples_writer import NTriplesWriter
+from .shacl.triple_buffer import TripleBuffer
+from .shacl.turtle_writer import TurtleWriter
 from .shacl.iri_builder import Builder, SequedaBuilder, W3CBuilder
 
 logger = logging.getLogger(__name__)
 
+# prefixes of the vocabularies used in the shapes
+SHAPE_NAMESPACES = {"rdf": RDF, "rdfs": RDFS, "sh": SH, "xsd": XSD, "uq": UQ}
+
+
+def create_iri_builder(mode: str, base_iri: str) -> Builder:
+    """Returns the IRI builder of `mode`, i.e. "w3c" or "thapa"."""
+
+    if mode == "w3c":
+        return W3CBuilder(base_iri)
+
+    elif mode == "thapa":
+        return SequedaBuilder(base_iri)
+
+    raise ValueError("Unknown IRI builder provided")
+
+
+def write_serialized(
+    serialized: str, destination: Union[str, TextIO, None]
+) -> Optional[str]:
+    """Writes `serialized` to `destination`, a file path or a text stream, or returns it if None."""
+
+    if destination is None:
+        return serialized
+
+    if isinstance(destination, str):
+        with open(destination, "w", encoding="utf-8") as f:
+            f.write(serialized)
+
+    else:
+        destination.write(serialized)
+
+    return None
+
 
 class ConstraintRewriter:
 
     def __init__(self, ddl_manager: DDL, iri_builder: Builder):
         self.ddl_manager = ddl_manager
         self.iri_builder = iri_builder
-        self.shapes_graph = Graph()
+        self.shapes = TripleBuffer()
 
     @classmethod
     def setup(
         cls,
-        ddl_script: str,
+        ddl_script: Union[str, TextIO],
         base_iri: str = "http://example.org/base/",
         mode: str = "w3c",
+        fast_path: bool = True,
+        workers: int = 1,
+        keep_parsed: bool = False,
     ):
-        if mode == "w3c":
-            iri_builder = W3CBuilder(base_iri)
-
-        elif mode == "thapa":
-            iri_builder = SequedaBuilder(base_iri)
-
-        else:
-            raise ValueError("Unknown IRI builder provided")
+        iri_builder = create_iri_builder(mode, base_iri)
 
         logger.info("~~~ PARSING THE PROVIDED SQL SCRIPT ...")
-        ddl_manager = DDL(ddl_script)
+        ddl_manager = DDL(
+            ddl_script, fast_path=fast_path, workers=workers, keep_parsed=keep_parsed
+        )
 
         return cls(ddl_manager, iri_builder)
 
+    @classmethod
+    def from_model(
+        cls,
+        model_file: Union[str, TextIO],
+        base_iri: str = "http://example.org/base/",
+        mode: str = "w3c",
+    ):
+        """Returns a rewriter of the schema saved by `DDL.save`, without parsing any SQL."""
+
+        logger.info("~~~ LOADING THE SCHEMA MODEL ...")
+        return cls(DDL.load(model_file), create_iri_builder(mode, base_iri))
+
     def get_parsed_ddl(self) -> Dict[str, List[List[Token]]]:
-        """TODO"""
+        """Returns the parsed column expressions, requires `setup(..., keep_parsed=True)`."""
 
         return self.ddl_manager.relation_details
 
@@ -67,14 +115,83 @@ class ConstraintRewriter:
         pprint(self.get_parsed_ddl())
 
     def rewrite(self) -> None:
-        """TODO"""
+        """Writes the shapes of the parsed constraints into `shapes`."""
 
         logger.info("~~~ REWRITING THE PARSED SQL CONSTRAINTS ...")
-        shaper = Shaper(self.iri_builder, self.ddl_manager)
+        shaper = Shaper(self.iri_builder, self.ddl_manager, self.shapes)
         shaper.shape_up()
-        self.shapes_graph += shaper.get_shapes()
 
-    def serialize_shapes(self) -> str:
+    def get_shapes(self) -> Graph:
+        """Returns the shapes as an rdflib `Graph`.
+
+        On first use, the graph is materialized from the `TripleBuffer` and replaces it
+        as `shapes`, so the shapes of later rewrites are added to the graph and changes
+        made to the graph by the caller are serialized in every format.
+        """
+
+        if not isinstance(self.shapes, Graph):
+            self.shapes = self.shapes.to_graph()
+
+        return self.shapes
+
+    @property
+    def shapes_graph(self) -> Graph:
+        """The shapes as an rdflib `Graph`, see `get_shapes`.
+
+        Assigning a `Graph`, e.g. by `rewriter.shapes_graph += other`, makes it the shapes.
+        """
+
+        return self.get_shapes()
+
+    @shapes_graph.setter
+    def shapes_graph(self, graph: Graph) -> None:
+        self.shapes = graph
+
+    def serialize_shapes(
+        self, format: str = "ttl", destination: Union[str, TextIO, None] = None
+    ) -> Optional[str]:
+        """Serializes the shapes, returning them as a string unless `destination` is given.
+
+        `destination` is a file path or a text stream. With `format="nt"`, the shapes are
+        streamed relation by relation as N-Triples, without storing the shapes,
+        so `rewrite()` need not be called before, unless `get_shapes` handed out the shapes
+        as a `Graph`, which is written instead. Turtle is written from `shapes`
+        by `TurtleWriter`, with the base IRI bound to the `base` prefix. Any other
+        format is written by rdflib from the `Graph` of `get_shapes`.
+        """
+
+        if format == "nt" and not isinstance(self.shapes, Graph):
+            return self._stream_ntriples(destination)
+
+        if format in ("ttl", "turtle"):
+            namespaces = dict(SHAPE_NAMESPACES, base=self.iri_builder.base)
+            serialized = TurtleWriter(namespaces).serialize(self.shapes)
+
+        else:
+            shapes_graph = self.get_shapes()
+            shapes_graph.bind("uq", UQ)
+            serialized = shapes_graph.serialize(format=format)
+
+        return write_serialized(serialized, destination)
+
+    def _stream_ntriples(self, destination: Union[str, TextIO, None]) -> Optional[str]:
+        """Shapes the relations straight into an `NTriplesWriter` on `destination`."""
+
+        if destination is None:
+            stream = StringIO()
+            self._shape_into(NTriplesWriter(stream))
+            return stream.getvalue()
+
+        if isinstance(destination, str):
+            with open(destination, "w", encoding="utf-8") as stream:
+                self._shape_into(NTriplesWriter(stream))
+
+        else:
+            self._shape_into(NTriplesWriter(destination))
+
+        return None
 
-        self.shapes_graph.bind("uq", UQ)
-        return self.shapes_graph.serialize(format="ttl")
+    def _shape_into(self, writer: NTriplesWriter) -> None:
+        logger.info("~~~ STREAMING THE REWRITTEN SQL CONSTRAINTS AS N-TRIPLES ...")
+        Shaper(self.iri_builder, self.ddl_manager, writer).shape_up()
+        writer.flush()
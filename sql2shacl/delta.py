@@ -0,0 +1,147 @@
+"""
+Copyright 2024 Lukas Kubelka and Xuemin Duan
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+import logging
+from typing import Dict, Iterable, NamedTuple, Set, TextIO, Tuple, Union
+from rdflib import BNode
+from rdflib.term import Identifier
+from .constraint_rewriter import create_iri_builder
+from .shacl.iri_builder import Builder
+from .shacl.ntriples_writer import _nt_term
+from .shacl.shacl_provider import UQ
+from .shacl.shacl_shaper import Shaper
+from .shacl.triple_buffer import TripleBuffer
+from .sql.ddl import DDL
+from .sql.record import RelationRecord
+
+logger = logging.getLogger(__name__)
+
+Triple = Tuple[Identifier, Identifier, Identifier]
+
+_UNIQUE_COMPONENT = UQ["UniqueValuesConstraintComponent"]
+
+
+class ShapeDelta(NamedTuple):
+    """Triples to remove from and to add to the shapes of the old schema version.
+
+    Blank nodes are labelled deterministically, so the delta applies to shapes that were
+    loaded with the same labels, e.g. from the delta of the first version against an
+    empty script. `reshaped` names the relations whose shapes were compared.
+    """
+
+    added: Tuple[Triple, ...]
+    removed: Tuple[Triple, ...]
+    reshaped: Tuple[str, ...]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.added and not self.removed
+
+    def to_rdf_patch(self) -> str:
+        """Returns the delta as an RDF Patch, see https://afs.github.io/rdf-patch/."""
+
+        lines = ["TX .\n"]
+        lines.extend(
+            f"D {_nt_term(s)} {_nt_term(p)} {_nt_term(o)} .\n"
+            for s, p, o in self.removed
+        )
+        lines.extend(
+            f"A {_nt_term(s)} {_nt_term(p)} {_nt_term(o)} .\n" for s, p, o in self.added
+        )
+        lines.append("TC .\n")
+        return "".join(lines)
+
+
+def _fingerprints(ddl: DDL) -> Dict[str, RelationRecord]:
+    return {rel.name: rel.to_record() for rel in ddl.relations}
+
+
+def _neighbours(ddl: DDL, names: Iterable[str]) -> Set[str]:
+    """Returns the relations referencing or referenced by any of `names`."""
+
+    relations = {rel.name: rel for rel in ddl.relations}
+    neighbours = set()
+    for name in names:
+        neighbours |= ddl.referencing_relation_names(name)
+        if name in relations:
+            neighbours.update(relations[name].referenced_relation_names)
+
+    return {name for name in neighbours if name is not None}
+
+
+def _shape(ddl: DDL, iri_builder: Builder, names: Set[str]) -> TripleBuffer:
+    shapes = TripleBuffer()
+    relations = [rel for rel in ddl.relations if rel.name in names]
+    Shaper(iri_builder, ddl, shapes, relations, deterministic_b_nodes=True).shape_up()
+    return shapes
+
+
+def _is_component_triple(triple: Triple) -> bool:
+    s = triple[0]
+    return s == _UNIQUE_COMPONENT or (
+        isinstance(s, BNode) and str(s).startswith("component")
+    )
+
+
+def diff(
+    old_sql: Union[str, TextIO, DDL],
+    new_sql: Union[str, TextIO, DDL],
+    base_iri: str = "http://example.org/base/",
+    mode: str = "w3c",
+    workers: int = 1,
+) -> ShapeDelta:
+    """Returns the delta between the shapes of two versions of a schema.
+
+    Each relation is fingerprinted by its classified definition. Only the relations that
+    changed, were added or were removed are shaped again, together with the relations that
+    reference them or that they reference, in either version, since the shapes of a
+    relation depend on its neighbours, e.g. the binary relations of thapa mode.
+    The unique values constraint component is never removed, as relations left
+    unshaped may still use it.
+
+    Either version may also be given as a `DDL` as parsed, e.g. the old version kept from
+    the previous run, so that it is not parsed again.
+    """
+
+    iri_builder = create_iri_builder(mode, base_iri)
+    old_ddl = old_sql if isinstance(old_sql, DDL) else DDL(old_sql, workers=workers)
+    new_ddl = new_sql if isinstance(new_sql, DDL) else DDL(new_sql, workers=workers)
+
+    old_fingerprints = _fingerprints(old_ddl)
+    new_fingerprints = _fingerprints(new_ddl)
+    changed = {
+        name
+        for name in old_fingerprints.keys() | new_fingerprints.keys()
+        if old_fingerprints.get(name) != new_fingerprints.get(name)
+    }
+    reshaped = changed | _neighbours(old_ddl, changed) | _neighbours(new_ddl, changed)
+    logger.info(
+        f"{len(changed)} relations changed, reshaping {len(reshaped)} relations"
+    )
+
+    old_shapes = _shape(old_ddl, iri_builder, reshaped)
+    new_shapes = _shape(new_ddl, iri_builder, reshaped)
+
+    return ShapeDelta(
+        added=tuple(triple for triple in new_shapes if triple not in old_shapes),
+        removed=tuple(
+            triple
+            for triple in old_shapes
+            if triple not in new_shapes and not _is_component_triple(triple)
+        ),
+        reshaped=tuple(sorted(reshaped)),
+    )
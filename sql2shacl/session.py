@@ -0,0 +1,262 @@
+"""
+Copyright 2024 Lukas Kubelka and Xuemin Duan
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, TextIO, Tuple, Union
+from .cache import ResultCache
+from .constraint_rewriter import (
+    ConstraintRewriter,
+    create_iri_builder,
+    write_serialized,
+)
+from .shacl.iri_builder import get_sqldtype_xmlschema_map
+from .shacl.shacl_shaper import _unique_component_triples
+from .sql.ddl import DDL
+from .utils import exceptions
+from .utils.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# sessions of a process of a `ProcessPoolExecutor`, by their settings
+_process_sessions: Dict[Tuple, "RewriterSession"] = {}
+
+
+def _rewrite_in_process(
+    session_args: Tuple, cache_args: Optional[Tuple], sql: str, format: str
+) -> str:
+    session = _process_sessions.get((session_args, cache_args))
+    if session is None:
+        cache = ResultCache(*cache_args) if cache_args else None
+        session = RewriterSession(*session_args, cache=cache)
+        _process_sessions[(session_args, cache_args)] = session
+
+    return session.rewrite(sql, format=format)
+
+
+class RewriterSession:
+    """Rewrites SQL scripts to SHACL shapes with the same settings, set up once.
+
+    Logging is configured, the IRI builder created, and the datatype map and the
+    unique values constraint component are loaded when the session is created,
+    so that `rewrite` only parses and shapes the given script. The IRI builder,
+    and with it its cache of built IRIs, is shared by all rewrites of the session.
+
+    Pass `log_level=None` to leave the logging configuration of the application as is.
+
+    `arewrite` runs rewrites from async code in `executor`, by default a thread pool
+    owned by the session, see `arewrite` for `max_concurrency` and `max_queue`.
+
+    With a `cache`, a `ResultCache` or its directory, scripts rewritten before with
+    the same settings are served from the cache without parsing them.
+
+    Instead of a script, `rewrite` also takes a `DDL`, e.g. loaded by `DDL.load`
+    from a model file, which is shaped without parsing and bypasses the cache.
+    The given `DDL` is left as it is, see `Shaper`.
+    """
+
+    def __init__(
+        self,
+        base_iri: str = "http://example.org/base/",
+        mode: str = "w3c",
+        log_level: Optional[int] = logging.WARNING,
+        log_file: str = None,
+        workers: int = 1,
+        format: str = "ttl",
+        executor: Optional[Executor] = None,
+        max_concurrency: Optional[int] = None,
+        max_queue: int = 64,
+        cache: Union[ResultCache, str, None] = None,
+    ):
+        if log_level is not None:
+            setup_logging(log_level, log_file)
+
+        self.base_iri = base_iri
+        self.mode = mode
+        self.workers = workers
+        self.format = format
+        self.iri_builder = create_iri_builder(mode, base_iri)
+        self.cache = ResultCache(cache) if isinstance(cache, str) else cache
+
+        self.executor = executor
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self._owns_executor = executor is None
+        self._session_args = (base_iri, mode, log_level, log_file, workers, format)
+        self._cache_args = (
+            None if self.cache is None else (self.cache.directory, self.cache.max_bytes)
+        )
+        self._semaphore = None
+        self._loop = None
+        self._n_pending = 0
+
+        get_sqldtype_xmlschema_map()
+        _unique_component_triples()
+
+    def rewrite(
+        self,
+        sql: Union[str, TextIO, DDL],
+        format: Optional[str] = None,
+        destination: Union[str, TextIO, None] = None,
+    ) -> Optional[str]:
+        """Returns the shapes of `sql` serialized in `format`, the session's format by default.
+
+        If `destination`, a file path or a text stream, is given, the shapes are written
+        there instead and None is returned. Errors of the rewriting are logged and re-raised.
+        """
+
+        format = format or self.format
+
+        if self.cache is None or isinstance(sql, DDL):
+            return self._rewrite(sql, format, destination)
+
+        if not isinstance(sql, str):
+            sql = sql.read()
+
+        key = self.cache.key(sql, self.mode, self.base_iri, format)
+        shapes = self.cache.get(key)
+
+        if shapes is None:
+            shapes = self._rewrite(sql, format, None)
+            self.cache.put(key, shapes)
+
+        return write_serialized(shapes, destination)
+
+    def _rewrite(
+        self,
+        sql: Union[str, TextIO, DDL],
+        format: str,
+        destination: Union[str, TextIO, None],
+    ) -> Optional[str]:
+        try:
+            ddl = sql if isinstance(sql, DDL) else DDL(sql, workers=self.workers)
+            rewriter = ConstraintRewriter(ddl, self.iri_builder)
+
+            # N-Triples are streamed while shaping, without storing the shapes
+            if format != "nt":
+                rewriter.rewrite()
+
+        except exceptions.MissingSQLDatatypeException:
+            logger.error(
+                "It seems there are missing data types in the column definitions"
+            )
+            raise
+
+        return rewriter.serialize_shapes(format=format, destination=destination)
+
+    async def arewrite(
+        self, sql: Union[str, TextIO], format: Optional[str] = None
+    ) -> str:
+        """Returns the shapes of `sql` like `rewrite`, without blocking the event loop.
+
+        The rewrite runs in the session's executor, at most `max_concurrency` at a time,
+        and up to `max_queue` further calls wait for a free slot. Beyond that, the call
+        raises a `RewriterBusyException` right away. Cancelling the call drops a rewrite
+        that has not started yet. A started rewrite cannot be interrupted, so it keeps
+        its slot until it finishes, and its result is discarded.
+        The asynchronous API of a session serves one event loop at a time.
+        """
+
+        if self._n_pending >= self.max_concurrency + self.max_queue:
+            raise exceptions.RewriterBusyException(
+                f"{self._n_pending} rewrites are pending already"
+            )
+
+        if not isinstance(sql, str):
+            sql = sql.read()
+
+        # the slots are bound to the event loop, and are set up anew for another loop
+        # once the calls of the previous one are done
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or (self._loop is not loop and not self._n_pending):
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+
+        self._n_pending += 1
+        try:
+            await self._semaphore.acquire()
+
+        except BaseException:
+            self._n_pending -= 1
+            raise
+
+        try:
+            future = self._submit(sql, format or self.format)
+
+        except BaseException:
+            self._release_slot()
+            raise
+
+        future.add_done_callback(lambda _: self._release_slot_from(loop))
+        return await asyncio.wrap_future(future)
+
+    def _submit(self, sql: str, format: str) -> Future:
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="sql2shacl"
+            )
+
+        if isinstance(self.executor, ProcessPoolExecutor):
+            # the session is not sent along, each process sets up its own once
+            return self.executor.submit(
+                _rewrite_in_process, self._session_args, self._cache_args, sql, format
+            )
+
+        return self.executor.submit(self.rewrite, sql, format)
+
+    def _release_slot(self) -> None:
+        self._n_pending -= 1
+        self._semaphore.release()
+
+    def _release_slot_from(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release_slot)
+
+        except RuntimeError:
+            # the event loop is closed already, so no call is waiting for the slot
+            pass
+
+    def close(self) -> None:
+        """Shuts down the executor of `arewrite`, if the session created it."""
+
+        if self._owns_executor and self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+
+@lru_cache(maxsize=None)
+def _shared_session(base_iri: str, mode: str, format: str) -> RewriterSession:
+    return RewriterSession(base_iri, mode, log_level=None, format=format)
+
+
+async def arewrite(
+    sql: Union[str, TextIO],
+    base_iri: str = "http://example.org/base/",
+    mode: str = "w3c",
+    format: str = "ttl",
+) -> str:
+    """Returns the shapes of `sql` like `sql2shacl.rewrite`, without blocking the event loop.
+
+    The rewrite runs in a `RewriterSession` shared by all calls with the same settings,
+    so its concurrency limit and queue apply to all of them, see `RewriterSession.arewrite`.
+    The logging configuration of the application is left as is.
+    """
+
+    return await _shared_session(base_iri, mode, format).arewrite(sql)
@@ -17,27 +17,58 @@ limitations under the License.
 
 import logging
 import json
+import re
+import threading
 import urllib.parse
 
-from functools import wraps
+from functools import lru_cache, wraps
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from collections.abc import Iterable
-from pathlib import Path
-from typing import List, Union
+from importlib.resources import files
+from types import MappingProxyType
+from typing import List, Mapping, Union
 from rdflib import URIRef
 from ..utils.exceptions import UnsupportedSQLDatatypeException
 
-with open(Path("sql2shacl") / "components" / "sqldatatype2xmlschema.json") as f:
-    SQLDTYPE_XMLSCHEMA_MAP = json.loads(f.read())
-
 logger = logging.getLogger(__name__)
 
+# strings made only of iunreserved characters (RFC 3987) are IRI-safe as they are
+_IUNRESERVED_REGEX = re.compile(r"[A-Za-z0-9\-._~\u0080-\U0010FFFF]*")
+
+
+@lru_cache(maxsize=None)
+def get_sqldtype_xmlschema_map() -> Mapping[str, str]:
+    """Returns the map from SQL data types to XML Schema datatype IRIs, loaded on first use.
+
+    The map is shared by all rewrites of the process, so it is read-only.
+    """
+
+    return MappingProxyType(
+        json.loads(
+            (
+                files("sql2shacl") / "components" / "sqldatatype2xmlschema.json"
+            ).read_text(encoding="utf-8")
+        )
+    )
+
+
+def __getattr__(name: str):
+    # `SQLDTYPE_XMLSCHEMA_MAP` is kept as a module attribute, but only loaded when accessed
+    if name == "SQLDTYPE_XMLSCHEMA_MAP":
+        return get_sqldtype_xmlschema_map()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class IRISafe:
 
     def iri_safe(string: str) -> str:
         """Return IRI-safe string."""
 
+        if _IUNRESERVED_REGEX.fullmatch(string):
+            return string
+
         # Define the characters that should be considered safe.
         # These include unreserved characters as well as non-ASCII characters (e.g., Chinese).
         def is_iunreserved(char):
@@ -67,24 +98,65 @@ class IRISafe:
             return param
 
     def iri_safe_params(func):
-        """Decorator that %-escapes strings used for IRIs."""
+        """Decorator that %-escapes strings used for IRIs, the builder itself is passed as is."""
 
         @wraps(func)
-        def wrapper(*args, **kwargs):
+        def wrapper(self, *args, **kwargs):
             quoted_args = [IRISafe.recursive_iri_safe(arg) for arg in args]
             quoted_kwargs = {
                 k: IRISafe.recursive_iri_safe(v) for k, v in kwargs.items()
             }
 
-            return func(*quoted_args, **quoted_kwargs)
+            return func(self, *quoted_args, **quoted_kwargs)
 
         return wrapper
 
 
+def cached_iri(func):
+    """Decorator that memoizes built IRIs in the bounded LRU cache of the builder.
+
+    List arguments are keyed as tuples. Calls with keyword arguments are not cached.
+    """
+
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if kwargs:
+            return func(self, *args, **kwargs)
+
+        key = (name,) + tuple(
+            tuple(arg) if isinstance(arg, list) else arg for arg in args
+        )
+        cache = self._iri_cache
+
+        # a builder may be shared by rewrites running in several threads
+        with self._iri_cache_lock:
+            iri = cache.get(key)
+            if iri is not None:
+                cache.move_to_end(key)
+                return iri
+
+        iri = func(self, *args)
+
+        with self._iri_cache_lock:
+            cache[key] = iri
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+        return iri
+
+    return wrapper
+
+
 class Builder(ABC):
 
-    def __init__(self, base: str):
+    def __init__(self, base: str, cache_size: int = 4096):
         self.base = urllib.parse.quote(base, ":/")
+        # IRIs are built from the same few names over and over while shaping a schema
+        self.cache_size = cache_size
+        self._iri_cache = OrderedDict()
+        self._iri_cache_lock = threading.Lock()
 
     @abstractmethod
     def build_class_iri(self, rel_name: str) -> URIRef:
@@ -122,24 +194,28 @@ class Builder(ABC):
 
 class SequedaBuilder(Builder):
 
+    @cached_iri
     @IRISafe.iri_safe_params
     def build_class_iri(self, rel_name: str) -> URIRef:
         return URIRef(self.base + rel_name)
 
+    @cached_iri
     @IRISafe.iri_safe_params
     def build_attribute_iri(self, rel_name: str, attribute_name: str) -> URIRef:
         return URIRef(self.base + rel_name + "#" + attribute_name)
 
+    @cached_iri
     @IRISafe.iri_safe_params
     def build_datatype_iri(self, dtype: str) -> URIRef:
         try:
-            mapped = SQLDTYPE_XMLSCHEMA_MAP[dtype.upper()]
+            mapped = get_sqldtype_xmlschema_map()[dtype.upper()]
         except KeyError:
             raise UnsupportedSQLDatatypeException(
                 f"SQL datatype <{dtype}> is not supported as of today."
             )
         return URIRef(mapped)
 
+    @cached_iri
     @IRISafe.iri_safe_params
     def build_foreign_key_iri(
         self,
@@ -170,6 +246,7 @@ class SequedaBuilder(Builder):
 
 class W3CBuilder(SequedaBuilder):
 
+    @cached_iri
     @IRISafe.iri_safe_params
     def build_foreign_key_iri(
         self,
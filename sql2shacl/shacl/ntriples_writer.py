@@ -0,0 +1,82 @@
+"""
+Copyright 2024 Lukas Kubelka and Xuemin Duan
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+from typing import Iterable, TextIO, Tuple
+from rdflib import BNode, Literal
+from rdflib.term import Identifier
+
+
+def _nt_term(term: Identifier) -> str:
+    """Returns the N-Triples form of `term`."""
+
+    if isinstance(term, BNode):
+        return f"_:{term}"
+
+    if isinstance(term, Literal):
+        value = (
+            str(term)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+        if term.language:
+            return f'"{value}"@{term.language}'
+
+        if term.datatype:
+            return f'"{value}"^^<{term.datatype}>'
+
+        return f'"{value}"'
+
+    return f"<{term}>"
+
+
+class NTriplesWriter:
+    """Sink that writes triples as N-Triples to a text stream instead of storing them.
+
+    It accepts triples through the same `add` and `addN` calls as an rdflib `Graph`,
+    so `Shaper` can write into it directly. Triples are collected until `flush`,
+    which `Shaper` calls after each relation, and duplicates within one flush
+    are written only once. So memory is bounded by the shapes of one relation.
+    """
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self._pending = {}
+        self.n_triples = 0
+
+    def add(self, triple: Tuple[Identifier, Identifier, Identifier]) -> None:
+        self._pending[triple] = None
+
+    def addN(self, quads: Iterable[Tuple[Identifier, Identifier, Identifier, object]]):
+        for s, p, o, _ in quads:
+            self._pending[(s, p, o)] = None
+
+    def flush(self) -> None:
+        """Writes the pending triples to the stream."""
+
+        if not self._pending:
+            return
+
+        self._stream.write(
+            "".join(
+                f"{_nt_term(s)} {_nt_term(p)} {_nt_term(o)} .\n"
+                for s, p, o in self._pending
+            )
+        )
+        self.n_triples += len(self._pending)
+        self._pending.clear()
@@ -15,55 +15,129 @@ limitations under the License.
 
 """
 
+import hashlib
+from typing import Tuple
 from rdflib import Graph, URIRef, BNode, Literal, Namespace
+from rdflib.term import Identifier
 from rdflib.namespace import RDF, RDFS, SH
 
 UQ = Namespace("http://sirius−labs.no/shapes/unique#")
 
+# the terms shared by all shapes exist once, since every attribute access
+# on an rdflib namespace builds a new term
+_RDF_TYPE = RDF.type
+_RDFS_CLASS = RDFS.Class
+_SH_PROPERTY = SH.property
+_SH_PATH = SH.path
+_SH_INVERSE_PATH = SH.inversePath
+_SH_NODE_KIND = SH.nodeKind
+_SH_IRI = SH.IRI
+_SH_LITERAL = SH.Literal
+_SH_CLASS = SH["class"]
+_SH_DATATYPE = SH.datatype
+_SH_MAX_COUNT = SH.maxCount
+_SH_MIN_COUNT = SH.minCount
+_SH_NODE_SHAPE = SH.NodeShape
+_UQ_UNIQUE_VALUES_FOR_CLASS = UQ["uniqueValuesForClass"]
+_UQ_UNQ_PROP = UQ["unqProp"]
+_UQ_UNQ_FOR_CLASS = UQ["unqForClass"]
+_ONE = Literal(1)
+
 
 class Shape:
+    """Collects the triples of a shape, so that they can be added to a graph in one batch."""
 
     def __init__(self):
-        self.g = Graph()
+        self.triples = []
+
+    def add(self, triple: Tuple[Identifier, Identifier, Identifier]) -> None:
+        self.triples.append(triple)
 
     def __iter__(self):
-        return iter(self.g)
+        return iter(self.triples)
+
+    def __len__(self):
+        return len(self.triples)
 
-    def __iadd__(self, other):
-        if isinstance(other, Graph):
-            other += self.g
-        else:
-            raise TypeError("Cannot add Shape to non-Graph object")
-        return self
+    def write_to(self, sink: Graph) -> None:
+        """Adds the triples to `sink` with a single `addN` call."""
+
+        sink.addN((s, p, o, sink) for s, p, o in self.triples)
 
     @property
     def graph(self) -> Graph:
-        return self.g
+        g = Graph()
+        self.write_to(g)
+        return g
 
 
-class Prop(Shape):
+class ShapeContext:
+    """Blank nodes and terms of the shapes built during one rewriting run.
+
+    A property shape is identified by its subject, path and class or datatype,
+    so shaping the same property twice reuses its blank node.
+    Equal terms are interned, so that each distinct IRI or literal of the run exists once.
+    The registries live as long as the run, i.e. as long as the owning `Shaper`, unless
+    the shapes are streamed. Then they are cleared once the shapes of a relation are
+    written out, since a blank node is only ever shared within the shapes of a relation.
+
+    With `deterministic_b_nodes`, blank nodes are labelled by a hash of what identifies
+    their shape, so that every run labels the blank nodes of a shape alike,
+    e.g. to compute a delta between the shapes of two schema versions.
+    """
+
+    def __init__(self, deterministic_b_nodes: bool = False):
+        self.prop_b_nodes = {}
+        self.data_b_nodes = {}
+        self.terms = {}
+        self.deterministic_b_nodes = deterministic_b_nodes
+
+    def b_node(self, kind: str, *key: Identifier) -> BNode:
+        """Returns a new blank node for the shape of `kind` identified by `key`."""
+
+        if not self.deterministic_b_nodes:
+            return BNode()
 
-    _b_nodes = {}
+        digest = hashlib.sha1(kind.encode("utf-8"))
+        for term in key:
+            digest.update(b"\0" + term.n3().encode("utf-8"))
+
+        return BNode(f"{kind}{digest.hexdigest()}")
+
+    def clear(self) -> None:
+        """Drops the registered blank nodes and terms."""
+
+        self.prop_b_nodes.clear()
+        self.data_b_nodes.clear()
+        self.terms.clear()
+
+    def intern(self, term: Identifier) -> Identifier:
+        """Returns the term of the run that equals `term`, registering `term` if there is none."""
+
+        return self.terms.setdefault(term, term)
+
+
+class Prop(Shape):
 
     def __init__(self, rel: URIRef, path_obj: URIRef, class_obj: URIRef, b_node: BNode):
         super().__init__()
         self._b = b_node
-        self.g.add((rel, SH.property, b_node))
-        self.g.add((b_node, SH.path, path_obj))
-        self.g.add((b_node, SH.nodeKind, SH.IRI))
-        self.g.add((b_node, SH["class"], class_obj))
+        self.add((rel, _SH_PROPERTY, b_node))
+        self.add((b_node, _SH_PATH, path_obj))
+        self.add((b_node, _SH_NODE_KIND, _SH_IRI))
+        self.add((b_node, _SH_CLASS, class_obj))
 
     @property
     def blank_node(self) -> BNode:
         return self._b
 
     @classmethod
-    def shape(cls, rel: URIRef, path_obj: URIRef, class_obj: URIRef):
-        _b = cls._b_nodes.get((rel, path_obj, class_obj), None)
+    def shape(cls, ctx: ShapeContext, rel: URIRef, path_obj: URIRef, class_obj: URIRef):
+        _b = ctx.prop_b_nodes.get((rel, path_obj, class_obj), None)
 
         if _b is None:
-            _b = BNode()
-            cls._b_nodes[(rel, path_obj, class_obj)] = _b
+            _b = ctx.b_node("prop", rel, path_obj, class_obj)
+            ctx.prop_b_nodes[(rel, path_obj, class_obj)] = _b
 
         return Prop(rel, path_obj, class_obj, _b)
 
@@ -71,65 +145,68 @@ class Prop(Shape):
 class MaxProp(Prop):
 
     @classmethod
-    def shape(cls, rel: URIRef, path_obj: URIRef, class_obj: URIRef):
-        prop = Prop.shape(rel, path_obj, class_obj)
-        print(prop.g.serialize())
-        prop.g.add((prop.blank_node, SH.maxCount, Literal(1)))
-        print(prop.g.serialize())
+    def shape(cls, ctx: ShapeContext, rel: URIRef, path_obj: URIRef, class_obj: URIRef):
+        prop = Prop.shape(ctx, rel, path_obj, class_obj)
+        prop.add((prop.blank_node, _SH_MAX_COUNT, _ONE))
         return prop
 
 
 class CrdProp(MaxProp):
 
     @classmethod
-    def shape(cls, rel: URIRef, path_obj: URIRef, class_obj: URIRef):
-        maxprop = MaxProp.shape(rel, path_obj, class_obj)
-        maxprop.g.add((maxprop.blank_node, SH.minCount, Literal(1)))
+    def shape(cls, ctx: ShapeContext, rel: URIRef, path_obj: URIRef, class_obj: URIRef):
+        maxprop = MaxProp.shape(ctx, rel, path_obj, class_obj)
+        maxprop.add((maxprop.blank_node, _SH_MIN_COUNT, _ONE))
         return maxprop
 
 
 class InvProp(Prop):
 
     @classmethod
-    def shape(cls, rel: URIRef, inv_path_obj: URIRef, class_obj: URIRef):
-        _b = BNode()
-        prop = Prop.shape(rel, _b, class_obj)
-        prop.g.add((_b, SH.inversePath, inv_path_obj))
+    def shape(
+        cls, ctx: ShapeContext, rel: URIRef, inv_path_obj: URIRef, class_obj: URIRef
+    ):
+        # the path is a new blank node, so the property shape is never reused
+        # and is not registered in the context
+        _b = ctx.b_node("invpath", rel, inv_path_obj, class_obj)
+        prop_b = ctx.b_node("invprop", rel, inv_path_obj, class_obj)
+        prop = Prop(rel, _b, class_obj, prop_b)
+        prop.add((_b, _SH_INVERSE_PATH, inv_path_obj))
         return prop
 
 
 class InvMaxProp(InvProp):
 
     @classmethod
-    def shape(cls, rel: URIRef, inv_path_obj: URIRef, class_obj: URIRef):
-        invprop = InvProp.shape(rel, inv_path_obj, class_obj)
-        invprop.g.add((invprop.blank_node, SH.maxCount, Literal(1)))
+    def shape(
+        cls, ctx: ShapeContext, rel: URIRef, inv_path_obj: URIRef, class_obj: URIRef
+    ):
+        invprop = InvProp.shape(ctx, rel, inv_path_obj, class_obj)
+        invprop.add((invprop.blank_node, _SH_MAX_COUNT, _ONE))
         return invprop
 
 
 class Data(Shape):
 
-    _b_nodes = {}
-
     def __init__(self, rel: URIRef, path_obj: URIRef, dtype: URIRef, b_node: BNode):
         super().__init__()
         self._b = b_node
-        self.g.add((rel, SH.property, b_node))
-        self.g.add((b_node, SH.path, path_obj))
-        self.g.add((b_node, SH.nodeKind, SH.Literal))
-        self.g.add((b_node, SH.datatype, dtype))
+        self.add((rel, _SH_PROPERTY, b_node))
+        self.add((b_node, _SH_PATH, path_obj))
+        self.add((b_node, _SH_NODE_KIND, _SH_LITERAL))
+        self.add((b_node, _SH_DATATYPE, dtype))
 
     @property
     def blank_node(self) -> BNode:
         return self._b
 
     @classmethod
-    def shape(cls, rel: URIRef, path_obj: URIRef, dtype: URIRef):
-        _b = cls._b_nodes.get((rel, path_obj, dtype), None)
+    def shape(cls, ctx: ShapeContext, rel: URIRef, path_obj: URIRef, dtype: URIRef):
+        _b = ctx.data_b_nodes.get((rel, path_obj, dtype), None)
 
         if _b is None:
-            _b = BNode()
-            cls._b_nodes[(rel, path_obj, dtype)] = _b
+            _b = ctx.b_node("data", rel, path_obj, dtype)
+            ctx.data_b_nodes[(rel, path_obj, dtype)] = _b
 
         return Data(rel, path_obj, dtype, _b)
 
@@ -137,42 +214,42 @@ class Data(Shape):
 class MaxData(Data):
 
     @classmethod
-    def shape(cls, rel: URIRef, path_obj: URIRef, dtype: URIRef):
-        data = Data.shape(rel, path_obj, dtype)
-        data.g.add((data.blank_node, SH.maxCount, Literal(1)))
+    def shape(cls, ctx: ShapeContext, rel: URIRef, path_obj: URIRef, dtype: URIRef):
+        data = Data.shape(ctx, rel, path_obj, dtype)
+        data.add((data.blank_node, _SH_MAX_COUNT, _ONE))
         return data
 
 
 class CrdData(MaxData):
 
     @classmethod
-    def shape(cls, rel: URIRef, path_obj: URIRef, dtype: URIRef):
-        maxdata = MaxData.shape(rel, path_obj, dtype)
-        maxdata.g.add((maxdata.blank_node, SH.minCount, Literal(1)))
+    def shape(cls, ctx: ShapeContext, rel: URIRef, path_obj: URIRef, dtype: URIRef):
+        maxdata = MaxData.shape(ctx, rel, path_obj, dtype)
+        maxdata.add((maxdata.blank_node, _SH_MIN_COUNT, _ONE))
         return maxdata
 
 
 class UnqTuple(Shape):
 
-    def __init__(self, rel: URIRef, *unq_props: URIRef):
+    def __init__(self, b_node: BNode, rel: URIRef, *unq_props: URIRef):
         super().__init__()
-        _b = BNode()
-        self.g.add((rel, UQ["uniqueValuesForClass"], _b))
+        _b = b_node
+        self.add((rel, _UQ_UNIQUE_VALUES_FOR_CLASS, _b))
         for unq_prop_ in unq_props:
-            self.g.add((_b, UQ["unqProp"], unq_prop_))
-        self.g.add((_b, UQ["unqForClass"], rel))
+            self.add((_b, _UQ_UNQ_PROP, unq_prop_))
+        self.add((_b, _UQ_UNQ_FOR_CLASS, rel))
 
     @classmethod
-    def shape(cls, rel: URIRef, *unq_props: URIRef):
-        return UnqTuple(rel, *unq_props)
+    def shape(cls, ctx: ShapeContext, rel: URIRef, *unq_props: URIRef):
+        return UnqTuple(ctx.b_node("unq", rel, *unq_props), rel, *unq_props)
 
 
 class Node(Shape):
 
     def __init__(self, rel: URIRef):
         super().__init__()
-        self.g.add((rel, RDF.type, SH.NodeShape))
-        self.g.add((rel, RDF.type, RDFS.Class))
+        self.add((rel, _RDF_TYPE, _SH_NODE_SHAPE))
+        self.add((rel, _RDF_TYPE, _RDFS_CLASS))
 
     @classmethod
     def shape(cls, rel: URIRef):
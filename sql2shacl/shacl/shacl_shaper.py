@@ -16,10 +16,17 @@ limitations under the License.
 """
 
 import logging
-from rdflib import Graph
-from pathlib import Path
+from collections import defaultdict
+from functools import lru_cache
+from importlib.resources import files
+from typing import Dict, Iterable, Optional, Tuple, Union
+from itertools import chain
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.term import Identifier
 from .iri_builder import Builder, SequedaBuilder, W3CBuilder
+from .triple_buffer import TripleBuffer
 from .shacl_provider import (
+    Shape,
     Node,
     MaxData,
     CrdData,
@@ -29,6 +36,7 @@ from .shacl_provider import (
     InvMaxProp,
     InvProp,
     Prop,
+    ShapeContext,
 )
 from ..sql.ddl import DDL
 from ..sql.relation import Relation
@@ -44,39 +52,116 @@ from ..sql.constraint import (
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _unique_component_triples() -> Tuple[Tuple[Identifier, Identifier, Identifier]]:
+    """Returns the triples of the unique values constraint component, parsed once per process."""
+
+    ttl = (
+        files("sql2shacl") / "components" / "unique_values_constraint.ttl"
+    ).read_text(encoding="utf-8")
+    return tuple(Graph().parse(data=ttl, format="ttl"))
+
+
+def _deterministic_component_b_nodes(ctx: ShapeContext) -> Dict[BNode, BNode]:
+    """Maps the blank nodes of the component to blank nodes labelled by their triples."""
+
+    triples = _unique_component_triples()
+    b_nodes = {}
+    for b_node in {s for s, _, _ in triples if isinstance(s, BNode)}:
+        key = sorted(
+            (p.n3(), o.n3())
+            for s, p, o in triples
+            if s == b_node and not isinstance(o, BNode)
+        )
+        b_nodes[b_node] = ctx.b_node("component", *map(Literal, chain(*key)))
+
+    return b_nodes
+
+
 class Shaper:
     """Does the Constraint Rewriting from SQL to SHACL
 
     See Thapa2021 [1] for more details.
 
     [1] http://urn.nb.no/URN:NBN:no-90764
+
+    The shapes are written into `shapes_graph`, which can be any object with an rdflib-like
+    `addN`, e.g. a `Graph` or an `NTriplesWriter`. By default it is a `TripleBuffer`.
+    Only `relations` of the DDL are shaped if given, and `deterministic_b_nodes`
+    labels the blank nodes alike in every run, see `ShapeContext`.
+
+    The columns of primary keys are shaped as not null and the columns of single column
+    UNIQUE constraints as unique. This is tracked for the relation being shaped only,
+    so the given DDL is left as it is, e.g. to be shaped or compared again.
     """
 
-    def __init__(self, iri_builder: Builder, ddl_manager: DDL):
-        self._shapes_graph = Graph()
+    def __init__(
+        self,
+        iri_builder: Builder,
+        ddl_manager: DDL,
+        shapes_graph: Union[Graph, TripleBuffer, None] = None,
+        relations: Optional[Iterable[Relation]] = None,
+        deterministic_b_nodes: bool = False,
+    ):
+        self._shapes_graph = TripleBuffer() if shapes_graph is None else shapes_graph
+        self._flush_sink = getattr(self._shapes_graph, "flush", None)
         self._iri_builder = iri_builder
         self._ddl_manager = ddl_manager
-        self._relations = ddl_manager.relations
+        self._relations = (
+            ddl_manager.relations if relations is None else list(relations)
+        )
+        # columns of the relation being shaped marked by its table constraints
+        self._not_null_columns = set()
+        self._unique_columns = set()
         self._unq_component_added = False
+        self._context = ShapeContext(deterministic_b_nodes)
+
+    def _build_class_iri(self, rel_name: str) -> URIRef:
+        return self._context.intern(self._iri_builder.build_class_iri(rel_name))
+
+    def _build_attribute_iri(self, rel_name: str, attribute_name: str) -> URIRef:
+        return self._context.intern(
+            self._iri_builder.build_attribute_iri(rel_name, attribute_name)
+        )
+
+    def _build_datatype_iri(self, dtype: str) -> URIRef:
+        return self._context.intern(self._iri_builder.build_datatype_iri(dtype))
+
+    def _build_foreign_key_iri(self, *args) -> URIRef:
+        return self._context.intern(self._iri_builder.build_foreign_key_iri(*args))
+
+    def _build_foreign_key_iri_binary(self, *args) -> URIRef:
+        return self._context.intern(
+            self._iri_builder.build_foreign_key_iri_binary(*args)
+        )
+
+    def _is_not_null(self, col: Column) -> bool:
+        return col.has_not_null_constraint or col in self._not_null_columns
+
+    def _is_unique(self, col: Column) -> bool:
+        return col.has_unique_constraint or col in self._unique_columns
+
+    def _start_relation(self) -> None:
+        self._not_null_columns.clear()
+        self._unique_columns.clear()
 
     def _handle_unique_tab_constraint(self, tab_constraint: TableUnique) -> None:
         """TODO"""
 
         if len(tab_constraint.column_names) == 1:
-            col = tab_constraint.parent.get_column_by_name(
-                tab_constraint.column_names[0]
+            self._unique_columns.add(
+                tab_constraint.parent.get_column_by_name(tab_constraint.column_names[0])
             )
-            col.set_unique(True)
 
         else:
             rel_name = tab_constraint.parent.name
             col_uris = [
-                self._iri_builder.build_attribute_iri(rel_name, col_name)
+                self._build_attribute_iri(rel_name, col_name)
                 for col_name in tab_constraint.column_names
             ]
-            rel_uri = self._iri_builder.build_class_iri(rel_name)
+            rel_uri = self._build_class_iri(rel_name)
 
-            self._shapes_graph += UnqTuple.shape(rel_uri, *col_uris)
+            self._emit(UnqTuple.shape(self._context, rel_uri, *col_uris))
             self._ensure_unique_component()
 
     def _handle_primary_key_tab_constraint(
@@ -84,9 +169,10 @@ class Shaper:
     ) -> None:
         """Set all columns of primary key not null"""
 
-        for col_name in tab_constraint.column_names:
-            col = tab_constraint.parent.get_column_by_name(col_name)
-            col.set_not_null(True)
+        self._not_null_columns.update(
+            tab_constraint.parent.get_column_by_name(col_name)
+            for col_name in tab_constraint.column_names
+        )
 
     def _handle_foreign_key_tab_constraint(
         self, tab_constraint: TableForeignKey
@@ -98,31 +184,36 @@ class Shaper:
         col_names = tab_constraint.column_names
         referenced_col_names = tab_constraint.referenced_column_names
 
-        rel_uri = self._iri_builder.build_class_iri(rel_name)
-        referenced_rel_uri = self._iri_builder.build_class_iri(referenced_rel_name)
-        path_obj_uri = self._iri_builder.build_foreign_key_iri(
+        rel_uri = self._build_class_iri(rel_name)
+        referenced_rel_uri = self._build_class_iri(referenced_rel_name)
+        path_obj_uri = self._build_foreign_key_iri(
             rel_name,
             referenced_rel_name,
             col_names,
             referenced_col_names,
         )
 
-        if tab_constraint.all_referenced_columns_are_not_null:
-            self._shapes_graph += CrdProp.shape(
-                rel_uri, path_obj_uri, referenced_rel_uri
+        if all(
+            self._is_not_null(tab_constraint.parent.get_column_by_name(col_name))
+            for col_name in col_names
+        ):
+            self._emit(
+                CrdProp.shape(self._context, rel_uri, path_obj_uri, referenced_rel_uri)
             )
         else:
-            self._shapes_graph += MaxProp.shape(
-                rel_uri, path_obj_uri, referenced_rel_uri
+            self._emit(
+                MaxProp.shape(self._context, rel_uri, path_obj_uri, referenced_rel_uri)
             )
 
         if tab_constraint.group_of_referenced_columns_is_unique:
-            self._shapes_graph += InvMaxProp.shape(
-                referenced_rel_uri, path_obj_uri, rel_uri
+            self._emit(
+                InvMaxProp.shape(
+                    self._context, referenced_rel_uri, path_obj_uri, rel_uri
+                )
             )
         else:
-            self._shapes_graph += InvProp.shape(
-                referenced_rel_uri, path_obj_uri, rel_uri
+            self._emit(
+                InvProp.shape(self._context, referenced_rel_uri, path_obj_uri, rel_uri)
             )
 
     def _handle_table_constraint(self, tab_constraint: Constraint) -> None:
@@ -143,7 +234,9 @@ class Shaper:
             self._handle_foreign_key_tab_constraint(tab_constraint)
 
         else:
-            print(f"<{tab_constraint.name}> is not supported yet and will be skipped")
+            logger.warning(
+                f"<{tab_constraint.name}> is not supported yet and will be skipped"
+            )
 
     def _handle_datatype_col_constraint(self, col: Column) -> None:
         """TODO"""
@@ -153,39 +246,65 @@ class Shaper:
         col_name = col.name
         dtype_name = col.data_type
 
-        rel_uri = self._iri_builder.build_class_iri(relation_name)
-        attribute_uri = self._iri_builder.build_attribute_iri(relation_name, col_name)
-        mapped_xmlschema_type_uri = self._iri_builder.build_datatype_iri(dtype_name)
+        rel_uri = self._build_class_iri(relation_name)
+        attribute_uri = self._build_attribute_iri(relation_name, col_name)
+        mapped_xmlschema_type_uri = self._build_datatype_iri(dtype_name)
 
-        if col.has_not_null_constraint:
-            self._shapes_graph += CrdData.shape(
-                rel_uri, attribute_uri, mapped_xmlschema_type_uri
+        if self._is_not_null(col):
+            self._emit(
+                CrdData.shape(
+                    self._context, rel_uri, attribute_uri, mapped_xmlschema_type_uri
+                )
             )
 
         else:
-            self._shapes_graph += MaxData.shape(
-                rel_uri, attribute_uri, mapped_xmlschema_type_uri
+            self._emit(
+                MaxData.shape(
+                    self._context, rel_uri, attribute_uri, mapped_xmlschema_type_uri
+                )
             )
 
+    def _emit(self, shape: Shape) -> None:
+        """Writes the triples of `shape` straight into the shapes graph."""
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"{type(shape).__name__} shape: "
+                + " ".join(f"{s.n3()} {p.n3()} {o.n3()} ." for s, p, o in shape)
+            )
+
+        shape.write_to(self._shapes_graph)
+
     def _ensure_unique_component(self) -> None:
         if not self._unq_component_added:
-            unq_component = Graph().parse(
-                Path("sql2shacl") / "components" / "unique_values_constraint.ttl",
-                format="ttl",
+            # fresh blank nodes per run, so that shapes of distinct runs stay apart
+            b_nodes = defaultdict(BNode)
+            if self._context.deterministic_b_nodes:
+                b_nodes = _deterministic_component_b_nodes(self._context)
+            self._shapes_graph.addN(
+                (
+                    b_nodes[s] if isinstance(s, BNode) else s,
+                    p,
+                    b_nodes[o] if isinstance(o, BNode) else o,
+                    self._shapes_graph,
+                )
+                for s, p, o in _unique_component_triples()
             )
-            self._shapes_graph += unq_component
             self._unq_component_added = True
 
     def _handle_unique_col_constraint(self, col: Column) -> None:
         """TODO"""
 
-        if col.has_unique_constraint:
+        if self._is_unique(col):
             rel_name = col.relation_name
             col_name = col.name
 
-            self._shapes_graph += UnqTuple.shape(
-                self._iri_builder.build_class_iri(rel_name),
-                self._iri_builder.build_attribute_iri(rel_name, col_name),
+            self._emit(
+                UnqTuple.shape(
+                    self._context,
+                    self._build_class_iri(rel_name),
+                    self._build_attribute_iri(rel_name, col_name),
+                )
             )
             self._ensure_unique_component()
 
@@ -197,32 +316,40 @@ class Shaper:
             rel_name = ref.parent.relation_name
             refereced_rel_name = ref.referenced_relation_name
 
-            rel_uri = self._iri_builder.build_class_iri(rel_name)
-            referenced_rel_uri = self._iri_builder.build_class_iri(refereced_rel_name)
+            rel_uri = self._build_class_iri(rel_name)
+            referenced_rel_uri = self._build_class_iri(refereced_rel_name)
 
-            path_obj_uri = self._iri_builder.build_foreign_key_iri(
+            path_obj_uri = self._build_foreign_key_iri(
                 col.relation_name,
                 ref.referenced_relation_name,
                 [ref.parent.name],
                 [ref.referenced_column_name],
             )
 
-            if col.has_not_null_constraint:
-                self._shapes_graph += CrdProp.shape(
-                    rel_uri, path_obj_uri, referenced_rel_uri
+            if self._is_not_null(col):
+                self._emit(
+                    CrdProp.shape(
+                        self._context, rel_uri, path_obj_uri, referenced_rel_uri
+                    )
                 )
             else:
-                self._shapes_graph += MaxProp.shape(
-                    rel_uri, path_obj_uri, referenced_rel_uri
+                self._emit(
+                    MaxProp.shape(
+                        self._context, rel_uri, path_obj_uri, referenced_rel_uri
+                    )
                 )
 
-            if col.has_unique_constraint:
-                self._shapes_graph += InvMaxProp.shape(
-                    referenced_rel_uri, path_obj_uri, rel_uri
+            if self._is_unique(col):
+                self._emit(
+                    InvMaxProp.shape(
+                        self._context, referenced_rel_uri, path_obj_uri, rel_uri
+                    )
                 )
             else:
-                self._shapes_graph += InvProp.shape(
-                    referenced_rel_uri, path_obj_uri, rel_uri
+                self._emit(
+                    InvProp.shape(
+                        self._context, referenced_rel_uri, path_obj_uri, rel_uri
+                    )
                 )
 
     def _handle_column_constraint(self, col: Column) -> None:
@@ -236,8 +363,9 @@ class Shaper:
         """TODO"""
 
         logger.info(f"Shaping relation {rel.name} ...")
-        node_shape = Node.shape(self._iri_builder.build_class_iri(rel.name))
-        self._shapes_graph += node_shape
+        self._start_relation()
+        node_shape = Node.shape(self._build_class_iri(rel.name))
+        self._emit(node_shape)
 
         # table constraints must be handled first
         for table_constraint in rel.table_constraints:
@@ -255,6 +383,7 @@ class Shaper:
         """
 
         logger.info(f"Shaping binary relation {rel.name} ...")
+        self._start_relation()
 
         ref_rel_names = []
         col_names = []
@@ -284,32 +413,36 @@ class Shaper:
                     """
                 )
 
-        bin_rel_iri = self._iri_builder.build_foreign_key_iri_binary(
+        bin_rel_iri = self._build_foreign_key_iri_binary(
             rel.name,
             col_names[0],
             col_names[1],
             ref_col_names[0],
             ref_col_names[1],
         )
-        ref_rel_1_iri = self._iri_builder.build_class_iri(ref_rel_names[0])
-        ref_rel_2_iri = self._iri_builder.build_class_iri(ref_rel_names[1])
+        ref_rel_1_iri = self._build_class_iri(ref_rel_names[0])
+        ref_rel_2_iri = self._build_class_iri(ref_rel_names[1])
 
-        if rel.get_column_by_name(col_names[0]).has_unique_constraint:
-            self._shapes_graph += MaxProp.shape(
-                ref_rel_1_iri, bin_rel_iri, ref_rel_2_iri
+        if self._is_unique(rel.get_column_by_name(col_names[0])):
+            self._emit(
+                MaxProp.shape(self._context, ref_rel_1_iri, bin_rel_iri, ref_rel_2_iri)
             )
 
         else:
-            self._shapes_graph += Prop.shape(ref_rel_1_iri, bin_rel_iri, ref_rel_2_iri)
+            self._emit(
+                Prop.shape(self._context, ref_rel_1_iri, bin_rel_iri, ref_rel_2_iri)
+            )
 
-        if rel.get_column_by_name(col_names[1]).has_unique_constraint:
-            self._shapes_graph += InvMaxProp.shape(
-                ref_rel_2_iri, bin_rel_iri, ref_rel_1_iri
+        if self._is_unique(rel.get_column_by_name(col_names[1])):
+            self._emit(
+                InvMaxProp.shape(
+                    self._context, ref_rel_2_iri, bin_rel_iri, ref_rel_1_iri
+                )
             )
 
         else:
-            self._shapes_graph += InvProp.shape(
-                ref_rel_2_iri, bin_rel_iri, ref_rel_1_iri
+            self._emit(
+                InvProp.shape(self._context, ref_rel_2_iri, bin_rel_iri, ref_rel_1_iri)
             )
 
     def shape_up(self) -> None:
@@ -323,11 +456,25 @@ class Shaper:
                 else:
                     self._shape_binary_relation(relation_)
 
+                self._flush_shapes()
+
         if type(self._iri_builder) is W3CBuilder:
             for relation_ in self._relations:
                 self._shape_relation(relation_)
+                self._flush_shapes()
+
+    def _flush_shapes(self) -> None:
+        """Lets streaming sinks, e.g. `NTriplesWriter`, write out the shapes of a relation."""
+
+        if self._flush_sink is not None:
+            self._flush_sink()
+            # the memory of a streamed run is bounded by the largest relation
+            self._context.clear()
 
     def get_shapes(self) -> Graph:
-        """TODO"""
+        """Returns the shapes as an rdflib `Graph`, materializing it from a `TripleBuffer`."""
+
+        if isinstance(self._shapes_graph, TripleBuffer):
+            return self._shapes_graph.to_graph()
 
         return self._shapes_graph
@@ -0,0 +1,61 @@
+"""
+Copyright 2024 Lukas Kubelka and Xuemin Duan
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+from typing import Iterable, Iterator, Tuple
+from rdflib import Graph
+from rdflib.term import Identifier
+
+
+class TripleBuffer:
+    """Append-only store of the triples of the shapes, in insertion order and without duplicates.
+
+    Shaping only ever adds triples until they are serialized, so unlike rdflib's `Memory`
+    store it keeps no indexes, just one dict entry per triple. It accepts triples through
+    the same `add` and `addN` calls as an rdflib `Graph`, and `to_graph` materializes
+    a `Graph` for callers that want to query the shapes.
+    """
+
+    __slots__ = ("_triples",)
+
+    def __init__(
+        self, triples: Iterable[Tuple[Identifier, Identifier, Identifier]] = ()
+    ):
+        self._triples = dict.fromkeys(triples)
+
+    def add(self, triple: Tuple[Identifier, Identifier, Identifier]) -> None:
+        self._triples[triple] = None
+
+    def addN(self, quads: Iterable[Tuple[Identifier, Identifier, Identifier, object]]):
+        triples = self._triples
+        for s, p, o, _ in quads:
+            triples[(s, p, o)] = None
+
+    def __iter__(self) -> Iterator[Tuple[Identifier, Identifier, Identifier]]:
+        return iter(self._triples)
+
+    def __len__(self) -> int:
+        return len(self._triples)
+
+    def __contains__(self, triple: Tuple[Identifier, Identifier, Identifier]) -> bool:
+        return triple in self._triples
+
+    def to_graph(self) -> Graph:
+        """Returns a new rdflib `Graph` of the buffered triples."""
+
+        graph = Graph()
+        graph.addN((s, p, o, graph) for s, p, o in self._triples)
+        return graph
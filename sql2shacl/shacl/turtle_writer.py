@@ -0,0 +1,192 @@
+"""
+Copyright 2024 Lukas Kubelka and Xuemin Duan
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from rdflib import BNode, Literal, URIRef
+from rdflib.namespace import RDF, XSD
+from rdflib.term import Identifier
+
+# local names made of these characters can be written as is, and `\\` escapes the second set,
+# see PN_LOCAL in https://www.w3.org/TR/turtle/#grammar-production-PN_LOCAL
+# `.` is left out on purpose, since rdflib does not parse an escaped trailing `\\.`
+_PLAIN_LOCAL_REGEX = re.compile(r"[A-Za-z0-9_:]+")
+_LOCAL_REGEX = re.compile(r"(?:[A-Za-z0-9_:\-]|%[0-9A-Fa-f]{2}|\\[~!$&'()*+,;=/?#@])*")
+_LOCAL_ESCAPE_REGEX = re.compile(r"([~!$&'()*+,;=/?#@])")
+_INTEGER_REGEX = re.compile(r"[+-]?[0-9]+")
+
+# looked up once, since attribute access on rdflib namespaces is slow
+_RDF_TYPE = RDF.type
+_XSD_INTEGER = XSD.integer
+
+
+def _escape_string(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class TurtleWriter:
+    """Writes triples as Turtle, nesting blank nodes that are referenced exactly once.
+
+    Unlike rdflib's Turtle serializer it neither sorts subjects nor discovers prefixes,
+    so its cost is linear in the number of triples. Subjects are written in the order
+    of their first triple, which keeps each node shape together with its property shapes.
+    IRIs are abbreviated with the given namespaces, and only the prefixes in use are declared.
+    """
+
+    def __init__(self, namespaces: Dict[str, str]):
+        # longest namespace first, so that e.g. a base IRI below a vocabulary still wins
+        self._namespaces = sorted(
+            ((str(ns), prefix) for prefix, ns in namespaces.items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._terms = {_RDF_TYPE: "a"}
+        self._used_prefixes = {}
+        self._b_node_labels = {}
+
+    def serialize(self, triples: Iterable[Tuple[Identifier, Identifier, Identifier]]):
+        """Returns the Turtle document of `triples`."""
+
+        subjects = {}
+        n_references = defaultdict(int)
+
+        for s, p, o in triples:
+            subjects.setdefault(s, {}).setdefault(p, []).append(o)
+            if type(o) is BNode:
+                n_references[o] += 1
+
+        self._subjects = subjects
+        self._inlined = {b for b, count in n_references.items() if count == 1}
+        self._written = set()
+
+        chunks = []
+        for s in subjects:
+            if s not in self._inlined:
+                self._write_statement(s, chunks)
+
+        # blank nodes referenced once, but only from within a cycle of blank nodes
+        for s in subjects:
+            if s not in self._written:
+                self._inlined.discard(s)
+                self._write_statement(s, chunks)
+
+        header = [
+            f"@prefix {prefix}: <{ns}> .\n"
+            for ns, prefix in self._used_prefixes.items()
+        ]
+        if header:
+            header.append("\n")
+
+        return "".join(header + chunks)
+
+    def _write_statement(self, s: Identifier, chunks: List[str]) -> None:
+        chunks.append(f"{self._term(s)} ")
+        self._write_predicates(s, chunks, "    ")
+        chunks.append(" .\n\n")
+
+    def _write_predicates(self, s: Identifier, chunks: List[str], indent: str) -> None:
+        self._written.add(s)
+        predicates = self._subjects[s]
+
+        # `a` goes first, otherwise predicates keep the order of their first triple
+        if _RDF_TYPE in predicates and next(iter(predicates)) is not _RDF_TYPE:
+            predicates = {_RDF_TYPE: predicates[_RDF_TYPE], **predicates}
+
+        for idx, p in enumerate(predicates):
+            if idx:
+                chunks.append(f" ;\n{indent}")
+
+            chunks.append(self._term(p))
+
+            for idx, o in enumerate(predicates[p]):
+                chunks.append(" " if idx == 0 else ", ")
+                self._write_object(o, chunks, indent)
+
+    def _write_object(self, o: Identifier, chunks: List[str], indent: str) -> None:
+        if o in self._inlined and o not in self._written:
+            if o not in self._subjects:
+                chunks.append("[]")
+                return
+
+            nested_indent = indent + "    "
+            chunks.append(f"[\n{nested_indent}")
+            self._write_predicates(o, chunks, nested_indent)
+            chunks.append(f"\n{indent}]")
+
+        else:
+            chunks.append(self._term(o))
+
+    def _term(self, term: Identifier) -> str:
+        try:
+            return self._terms[term]
+
+        except KeyError:
+            pass
+
+        if type(term) is BNode:
+            text = self._b_node_labels.setdefault(
+                term, f"_:b{len(self._b_node_labels)}"
+            )
+
+        elif isinstance(term, Literal):
+            text = self._literal(term)
+
+        else:
+            text = self._iri(term)
+
+        self._terms[term] = text
+        return text
+
+    def _iri(self, iri: URIRef) -> str:
+        # plain `str` methods, since rdflib's `URIRef` overrides some in Python
+        iri = str(iri)
+        for ns, prefix in self._namespaces:
+            if not iri.startswith(ns):
+                continue
+
+            local = iri[len(ns) :]
+            if not _PLAIN_LOCAL_REGEX.fullmatch(local):
+                local = _LOCAL_ESCAPE_REGEX.sub(r"\\\1", local)
+
+                if local.startswith("-") or not _LOCAL_REGEX.fullmatch(local):
+                    break
+
+            self._used_prefixes[ns] = prefix
+            return f"{prefix}:{local}"
+
+        return f"<{iri}>"
+
+    def _literal(self, literal: Literal) -> str:
+        value = str(literal)
+
+        if literal.datatype == _XSD_INTEGER and _INTEGER_REGEX.fullmatch(value):
+            return value
+
+        text = f'"{_escape_string(value)}"'
+        if literal.language:
+            return f"{text}@{literal.language}"
+
+        if literal.datatype:
+            return f"{text}^^{self._term(literal.datatype)}"
+
+        return text
@@ -18,12 +18,14 @@ limitations under the License.
 from __future__ import annotations
 
 import logging
+import sys
 from typing import List, Tuple, TYPE_CHECKING
 from sqlparse.sql import Token
 from sqlparse.tokens import Keyword
 from .constraint import ColumnForeignKey
+from .record import ColumnRecord
 from ..utils.exceptions import MissingSQLDatatypeException
-from ..shacl.iri_builder import SQLDTYPE_XMLSCHEMA_MAP
+from ..shacl.iri_builder import get_sqldtype_xmlschema_map
 
 logger = logging.getLogger(__name__)
 
@@ -33,13 +35,42 @@ if TYPE_CHECKING:
 
 class Column:
 
+    __slots__ = ("_parent", "_name", "_dtype", "_unique", "_not_null", "_reference")
+
     def __init__(self, parent: Relation, col_name: str, expression: List[Token]):
         self._parent = parent
         logger.info(f"with column <{col_name}>")
-        self._name = col_name
-        self._expression = expression
+        self._name = sys.intern(col_name)
         self._dtype, self._unique, self._not_null, self._reference = (
-            self._set_column_properties()
+            self._set_column_properties(expression)
+        )
+
+    @classmethod
+    def from_record(cls, parent: Relation, record: ColumnRecord) -> Column:
+        """Returns the column described by `record` without classifying any tokens."""
+
+        col = cls.__new__(cls)
+        col._parent = parent
+        col._name = sys.intern(record.name)
+        col._dtype = sys.intern(record.data_type)
+        col._unique = record.unique
+        col._not_null = record.not_null
+        col._reference = None
+
+        if record.reference is not None:
+            col._reference = ColumnForeignKey.from_record(col, record.reference)
+
+        return col
+
+    def to_record(self) -> ColumnRecord:
+        """Returns a picklable record of the column."""
+
+        return ColumnRecord(
+            self.name,
+            self.data_type,
+            self.has_unique_constraint,
+            self.has_not_null_constraint,
+            self.reference.to_record() if self.has_reference else None,
         )
 
     @property
@@ -98,13 +129,15 @@ class Column:
         self._unique = True
 
     def _is_predefined_data_type(self, tkn: Token) -> bool:
-        if str(tkn).upper() in SQLDTYPE_XMLSCHEMA_MAP.keys():
+        if str(tkn).upper() in get_sqldtype_xmlschema_map():
             return True
 
         else:
             return False
 
-    def _set_column_properties(self) -> Tuple[str, bool, bool, ColumnForeignKey]:
+    def _set_column_properties(
+        self, expression: List[Token]
+    ) -> Tuple[str, bool, bool, ColumnForeignKey]:
         """
         ```
         <column definition> ::=
@@ -208,9 +241,9 @@ class Column:
         not_null = False
         reference = None
 
-        for idx, tkn in enumerate(self._expression):
+        for idx, tkn in enumerate(expression):
             if self._is_predefined_data_type(tkn):
-                dtype = str(tkn)
+                dtype = sys.intern(str(tkn))
                 logger.info(f"that has data type: <{dtype}> ")
 
             elif tkn.match(Keyword, "UNIQUE"):
@@ -227,7 +260,7 @@ class Column:
                 logger.info("that has <PRIMARY KEY> column constraint")
 
             elif tkn.match(Keyword, "REFERENCES"):
-                constraint_args = self._expression[idx + 1 :]
+                constraint_args = expression[idx + 1 :]
 
                 reference = ColumnForeignKey(
                     self,
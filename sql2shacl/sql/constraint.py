@@ -18,9 +18,11 @@ limitations under the License.
 from __future__ import annotations
 
 import logging
+import sys
 from typing import List, Tuple, Union, TYPE_CHECKING
 from sqlparse.sql import Token
 from sqlparse.tokens import Name, Keyword, String
+from .record import ConstraintRecord, ReferenceRecord
 
 if TYPE_CHECKING:
     from .relation import Relation
@@ -31,12 +33,11 @@ logger = logging.getLogger(__name__)
 
 class Constraint:
 
-    def __init__(
-        self, parent: Union[Relation, Column], name: str, expression: List[Token]
-    ):
+    __slots__ = ("_parent", "_name")
+
+    def __init__(self, parent: Union[Relation, Column], name: str):
         self._parent = parent
-        self._name = name
-        self._expression = expression
+        self._name = sys.intern(name)
 
     @property
     def name(self) -> str:
@@ -50,7 +51,7 @@ class Constraint:
 
         return self._parent
 
-    def _break_down_expression(self):
+    def _break_down_expression(self, expression: List[Token]):
         """
         ```
         <table constraint definition> ::=
@@ -91,25 +92,43 @@ class Constraint:
 
 class TableUnique(Constraint):
 
+    __slots__ = ("_col_names",)
+
+    KIND = "UNIQUE"
+
     def __init__(self, parent: Relation, name: str, expression: List[Token]):
         if not isinstance(self, TablePrimaryKey):
             logger.info("with table constraint <UNIQUE>")
-        super().__init__(parent, name, expression)
-        self._col_names = self._break_down_expression()
+        super().__init__(parent, name)
+        self._col_names = self._break_down_expression(expression)
         logger.info(f"for columns <{tuple(self._col_names)}>")
 
-    def _break_down_expression(self) -> List[str]:
+    @classmethod
+    def from_record(cls, parent: Relation, record: ConstraintRecord) -> TableUnique:
+        """Returns the constraint described by `record` without breaking down any tokens."""
+
+        constraint = cls.__new__(cls)
+        Constraint.__init__(constraint, parent, record.name)
+        constraint._col_names = [sys.intern(name) for name in record.column_names]
+        return constraint
+
+    def to_record(self) -> ConstraintRecord:
+        """Returns a picklable record of the constraint."""
+
+        return ConstraintRecord(self.KIND, self.name, tuple(self.column_names))
+
+    def _break_down_expression(self, expression: List[Token]) -> List[str]:
         """TODO"""
 
         col_names = []
-        for tkn in self._expression:
+        for tkn in expression:
             if tkn.match(Name, None):
-                col_names.append(str(tkn))
+                col_names.append(sys.intern(str(tkn)))
 
             # needed for W3C RDB2RDF test cases (using quotes is not valid SQL syntax)
             if tkn.match(String.Symbol, None):
                 col_name = str(tkn).strip('"')
-                col_names.append(col_name)
+                col_names.append(sys.intern(col_name))
             #
 
         return col_names
@@ -123,6 +142,10 @@ class TableUnique(Constraint):
 
 class TablePrimaryKey(TableUnique):
 
+    __slots__ = ()
+
+    KIND = "PRIMARY KEY"
+
     def __init__(self, parent: Relation, name: str, expression: List[Token]):
         logger.info("with table constraint <PRIMARY KEY>")
         super().__init__(parent, name, expression)
@@ -130,18 +153,50 @@ class TablePrimaryKey(TableUnique):
 
 class TableForeignKey(Constraint):
 
+    __slots__ = ("_col_names", "_referenced_rel_name", "_referenced_col_names")
+
+    KIND = "FOREIGN KEY"
+
     def __init__(self, parent: Relation, name: str, expression: List[Token]):
         logger.info("with table constraint <FOREIGN KEY>")
-        super().__init__(parent, name, expression)
+        super().__init__(parent, name)
         (
             self._col_names,
             self._referenced_rel_name,
             self._referenced_col_names,
-        ) = self._break_down_expression()
+        ) = self._break_down_expression(expression)
         logger.info(
             f"for columns <{tuple(self._col_names)}> referencing columns <{tuple(self._referenced_col_names)}> of relation <{self._referenced_rel_name}>"
         )
 
+    @classmethod
+    def from_record(cls, parent: Relation, record: ConstraintRecord) -> TableForeignKey:
+        """Returns the constraint described by `record` without breaking down any tokens."""
+
+        constraint = cls.__new__(cls)
+        Constraint.__init__(constraint, parent, record.name)
+        constraint._col_names = [sys.intern(name) for name in record.column_names]
+        constraint._referenced_rel_name = record.referenced_relation_name
+        if constraint._referenced_rel_name is not None:
+            constraint._referenced_rel_name = sys.intern(
+                constraint._referenced_rel_name
+            )
+        constraint._referenced_col_names = [
+            sys.intern(name) for name in record.referenced_column_names
+        ]
+        return constraint
+
+    def to_record(self) -> ConstraintRecord:
+        """Returns a picklable record of the constraint."""
+
+        return ConstraintRecord(
+            self.KIND,
+            self.name,
+            tuple(self.column_names),
+            self.referenced_relation_name,
+            tuple(self.referenced_column_names),
+        )
+
     @property
     def column_names(self) -> List[str]:
         """TODO"""
@@ -180,35 +235,37 @@ class TableForeignKey(Constraint):
 
         return False
 
-    def _break_down_expression(self) -> Tuple[bool, bool, List[str], str, List[str]]:
+    def _break_down_expression(
+        self, expression: List[Token]
+    ) -> Tuple[List[str], str, List[str]]:
         """TODO"""
 
         col_names = []
         referenced_rel_name = None
         referenced_col_names = []
 
-        for idx, tkn in enumerate(self._expression):
+        for idx, tkn in enumerate(expression):
             if tkn.match(Name, None):
-                col_names.append(str(tkn))
+                col_names.append(sys.intern(str(tkn)))
 
             # needed for W3C RDB2RDF test cases (using quotes is not valid SQL syntax)
             if tkn.match(String.Symbol, None):
-                col_names.append(str(tkn).strip('"'))
+                col_names.append(sys.intern(str(tkn).strip('"')))
             #
 
             if tkn.match(Keyword, "REFERENCES"):
-                referenced_rel_name = str(self._expression[idx + 1])
+                referenced_rel_name = str(expression[idx + 1])
 
                 # needed for W3C RDB2RDF test cases (using quotes is not valid SQL syntax)
-                referenced_rel_name = referenced_rel_name.strip('"')
+                referenced_rel_name = sys.intern(referenced_rel_name.strip('"'))
                 #
 
-                for ref in self._expression[idx + 2 :]:
+                for ref in expression[idx + 2 :]:
                     if ref.match(Name, None):
-                        referenced_col_names.append(str(ref))
+                        referenced_col_names.append(sys.intern(str(ref)))
 
                     if ref.match(String.Symbol, None):
-                        referenced_col_names.append(str(ref).strip('"'))
+                        referenced_col_names.append(sys.intern(str(ref).strip('"')))
 
                 break
 
@@ -217,16 +274,35 @@ class TableForeignKey(Constraint):
 
 class ColumnForeignKey(Constraint):
 
+    __slots__ = ("_referenced_rel_name", "_referenced_col_name")
+
     def __init__(self, parent: Column, name: str, expression: List[Token]):
         logger.info("that has <REFERENCES> column constraint")
-        super().__init__(parent, name, expression)
+        super().__init__(parent, name)
         self._referenced_rel_name, self._referenced_col_name = (
-            self._break_down_expression()
+            self._break_down_expression(expression)
         )
         logger.info(
             f"referencing column <{self._referenced_col_name}> of relation <{self._referenced_rel_name}>"
         )
 
+    @classmethod
+    def from_record(cls, parent: Column, record: ReferenceRecord) -> ColumnForeignKey:
+        """Returns the constraint described by `record` without breaking down any tokens."""
+
+        constraint = cls.__new__(cls)
+        Constraint.__init__(constraint, parent, record.name)
+        constraint._referenced_rel_name = sys.intern(record.referenced_relation_name)
+        constraint._referenced_col_name = sys.intern(record.referenced_column_name)
+        return constraint
+
+    def to_record(self) -> ReferenceRecord:
+        """Returns a picklable record of the constraint."""
+
+        return ReferenceRecord(
+            self.name, self.referenced_relation_name, self.referenced_column_name
+        )
+
     @property
     def referenced_relation_name(self) -> str:
         return self._referenced_rel_name
@@ -235,7 +311,7 @@ class ColumnForeignKey(Constraint):
     def referenced_column_name(self) -> str:
         return self._referenced_col_name
 
-    def _break_down_expression(self) -> None:
+    def _break_down_expression(self, expression: List[Token]) -> Tuple[str, str]:
         """TODO
 
         ---
@@ -254,13 +330,13 @@ class ColumnForeignKey(Constraint):
         )
         ```
         """
-        referenced_rel_name = str(self._expression[0])
+        referenced_rel_name = str(expression[0])
 
         # needed for W3C RDB2RDF test cases (using quotes is not valid SQL syntax)
         referenced_rel_name = referenced_rel_name.strip('"')
         #
 
-        if len(self._expression) == 1:
+        if len(expression) == 1:
             referenced_col_name = self.parent.name
 
             # needed for W3C RDB2RDF test cases (using quotes is not valid SQL syntax)
@@ -268,7 +344,7 @@ class ColumnForeignKey(Constraint):
             #
 
         else:
-            parenthesis_content = self._expression[1:]
+            parenthesis_content = expression[1:]
 
             for tkn in parenthesis_content:
                 if tkn.match(Name, None):
@@ -279,4 +355,10 @@ class ColumnForeignKey(Constraint):
                     referenced_col_name = str(tkn).strip('"')
                     break
 
-        return referenced_rel_name, referenced_col_name
+        return sys.intern(referenced_rel_name), sys.intern(referenced_col_name)
+
+
+TABLE_CONSTRAINT_CLASSES = {
+    constraint_cls.KIND: constraint_cls
+    for constraint_cls in (TableUnique, TablePrimaryKey, TableForeignKey)
+}
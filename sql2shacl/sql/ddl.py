@@ -15,29 +15,128 @@ limitations under the License.
 
 """
 
+import gc
 import logging
-import sqlparse
-from typing import List, Dict, Tuple
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from io import TextIOBase
+from itertools import repeat
+from typing import IO, Iterable, List, Dict, Iterator, Set, TextIO, Tuple, Union
+from sqlparse import lexer
+from sqlparse.engine import grouping
+from sqlparse.engine.statement_splitter import StatementSplitter
 from sqlparse.sql import Identifier, Parenthesis, Token, TokenList, Statement
 from sqlparse.tokens import Name, Punctuation, Keyword, String, Comment
+from . import fast_parser, model
+from .record import RelationRecord
 from .relation import Relation
+from ..utils.exceptions import UnsupportedModelException, UnsupportedSyntaxException
 
 # from .identifier import is_valid_identifier
 
 logger = logging.getLogger(__name__)
 
+# more chunks than workers, so that workers finishing early pick up the slack
+CHUNKS_PER_WORKER = 4
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Pauses the garbage collector while building a model whose objects all stay alive.
+
+    The collections triggered by creating the objects would free nothing,
+    yet take most of the building time.
+    """
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+
+    finally:
+        if gc_enabled:
+            gc.enable()
+
 
 class DDL:
 
-    def __init__(self, ddl_script: str):
-        self._parsed = sqlparse.parse(ddl_script)
-        self._relation_details = self._break_down_statements()
-        self._relations = self._break_down_relations()
-        self._relations_dict = {rel.name: rel for rel in self._relations}
+    def __init__(
+        self,
+        ddl_script: Union[str, TextIO] = "",
+        fast_path: bool = True,
+        workers: int = 1,
+        keep_parsed: bool = False,
+    ):
+        """Parses and classifies the relations of `ddl_script`.
+
+        The parsed column expressions are dropped once a relation is classified,
+        unless `keep_parsed` is set to make them available as `relation_details`.
+        Worker processes only send back classified relations, so `keep_parsed`
+        requires `workers=1`.
+        """
+
+        if keep_parsed and workers > 1:
+            raise ValueError("keep_parsed=True requires workers=1")
+
+        self._fast_path = fast_path
+        self._keep_parsed = keep_parsed
+        self._relation_details = {}
+        self._relations_dict = {}
+        self._referenced_by = defaultdict(set)
+
+        if workers > 1:
+            for record in self._classify_in_parallel(ddl_script, workers):
+                self._add_relation(Relation.from_record(self, record))
+
+        else:
+            for relation_name, expressions in self._break_down_statements(ddl_script):
+                if keep_parsed:
+                    self._relation_details[relation_name] = expressions
+
+                self._add_relation(Relation(self, relation_name, expressions))
+
+    @classmethod
+    def from_records(cls, records: Iterable[RelationRecord]) -> "DDL":
+        """Returns the schema made of already classified relation records."""
+
+        ddl = cls()
+        for record in records:
+            ddl._add_relation(Relation.from_record(ddl, record))
+
+        return ddl
+
+    @classmethod
+    def load(cls, source: Union[str, IO[str]]) -> "DDL":
+        """Returns the schema saved by `save` to `source`, without parsing any SQL.
+
+        Raises an `UnsupportedModelException` if `source` is not a well-formed model file
+        of this version.
+        """
+
+        with _gc_paused():
+            records = model.load_records(source)
+            try:
+                return cls.from_records(records)
+
+            except (LookupError, TypeError, ValueError) as e:
+                raise UnsupportedModelException(
+                    f"Malformed relation in model file: {e!r}"
+                ) from e
+
+    def save(self, destination: Union[str, IO[str]]) -> None:
+        """Saves the classified relations as a model file, see `sql2shacl.sql.model`."""
+
+        model.dump_records((rel.to_record() for rel in self.relations), destination)
 
     @property
     def relation_details(self) -> Dict[str, List[List[Token]]]:
-        """TODO"""
+        """Returns the parsed column expressions per relation name, if kept."""
+
+        if not self._keep_parsed:
+            raise RuntimeError(
+                "Parsed DDL is not kept, create the DDL with keep_parsed=True"
+            )
 
         return self._relation_details
 
@@ -45,30 +144,44 @@ class DDL:
     def relation_names(self) -> List[str]:
         """TODO"""
 
-        return [rel_name for rel_name in self.relation_details.keys()]
+        return list(self._relations_dict.keys())
 
     @property
     def relations(self) -> List[Relation]:
         """TODO"""
 
-        return self._relations
+        return list(self._relations_dict.values())
 
-    def is_other_relation_referencing(self, rel: Relation) -> bool:
-        """TODO"""
+    def _add_relation(self, rel: Relation) -> None:
+        """Adds the relation and indexes its outgoing foreign keys by referenced relation name."""
 
-        others = [other for other in self.relations if other.name != rel.name]
+        replaced = self._relations_dict.get(rel.name)
+        if replaced is not None:
+            for referenced_name in replaced.referenced_relation_names:
+                self._referenced_by[referenced_name].discard(replaced.name)
 
-        for other_ in others:
-            if rel.name in other_.referenced_relation_names:
-                return True
+        self._relations_dict[rel.name] = rel
 
-        return False
+        for referenced_name in rel.referenced_relation_names:
+            self._referenced_by[referenced_name].add(rel.name)
+
+    def referencing_relation_names(self, rel_name: str) -> Set[str]:
+        """Returns the names of the relations with a foreign key pointing to `rel_name`."""
+
+        return set(self._referenced_by.get(rel_name, ()))
+
+    def is_other_relation_referencing(self, rel: Relation) -> bool:
+        """Returns if a relation other than `rel` has a foreign key pointing to `rel`."""
+
+        referencing_names = self._referenced_by.get(rel.name, ())
+
+        return any(name != rel.name for name in referencing_names)
 
     @staticmethod
     def _is_punctuation_end_of_expression(
-        punct: Token, expression: List[Token]
+        punct_idx: int, expression: List[Token]
     ) -> bool:
-        """Returns if punctionation is the end of an expression.
+        """Returns if the punctuation at position `punct_idx` is the end of an expression.
 
         This is the case in every column definition but the last one, e.g.:
             ```
@@ -101,7 +214,9 @@ class DDL:
             ```
         """
 
-        punct_idx = expression.index(punct)
+        if punct_idx + 2 >= len(expression):
+            return True
+
         next_tkn = expression[punct_idx + 1]
         next_next_tkn = expression[punct_idx + 2]
 
@@ -113,12 +228,6 @@ class DDL:
 
         return True
 
-    @staticmethod
-    def _is_end_of_parentesis_content(tkn: Token, tkn_list: List[Token]) -> bool:
-        """Returns True if the token is the last element in the list."""
-
-        return tkn_list.index(tkn) == (len(tkn_list) - 1)
-
     @staticmethod
     def _get_parenthesis_content(parenthesis_tkn: TokenList) -> List[Token]:
         """Returns the list of tokens with the starting and ending parentheses and 'Whitespace' removed."""
@@ -126,14 +235,77 @@ class DDL:
         content = list(parenthesis_tkn.flatten())[1:-1]
         return [tkn for tkn in content if not tkn.is_whitespace]
 
-    def _is_create_table_statement(self, stmt: Statement) -> bool:
+    @staticmethod
+    def _is_create_table_statement(stmt: Statement) -> bool:
+        """Returns if the (ungrouped) statement is a `CREATE [ <table scope> ] TABLE` statement.
+
+        Only the tokens in front of the table element list are inspected,
+        so that other statements can be dropped before they are grouped.
+        """
+
         if stmt.get_type() == "CREATE":
             for token in stmt.tokens:
                 if token.match(Keyword, "TABLE"):
                     return True
 
+                if token.match(Punctuation, "("):
+                    break
+
         return False
 
+    @staticmethod
+    def _stream_statements(
+        ddl_script: Union[str, TextIO], fast_path: bool = True
+    ) -> Iterator[Statement]:
+        """Yields the ungrouped `CREATE TABLE` statements of the script one at a time.
+
+        Statements are split without grouping, so that other statements are dropped cheaply
+        and at most one statement is alive at a time. With `fast_path`, the script is
+        tokenized and split by `fast_parser` instead of sqlparse's lexer and splitter.
+        """
+
+        if fast_path:
+            statements = fast_parser.split_statements(fast_parser.tokenize(ddl_script))
+        else:
+            statements = StatementSplitter().process(lexer.tokenize(ddl_script))
+
+        for stmt in statements:
+            if not DDL._is_create_table_statement(stmt):
+                logger.warning(
+                    f"Skipping the following statement as it does not seem to be a DDL 'CREATE TABLE' statement: <{str(stmt)}>"
+                )
+                continue
+
+            yield stmt
+
+    @staticmethod
+    def _split_table_elements(content: List[Token]) -> List[List[Token]]:
+        """Splits the table element list into one token list per table element.
+
+        The parenthesis content is walked once with an explicit cursor,
+        so that splitting is linear in the number of tokens.
+        """
+
+        expressions = []
+        expression_ = []
+
+        for idx, subtkn in enumerate(content):
+            if subtkn.match(Comment.Single, None):
+                continue
+
+            if subtkn.match(Punctuation, ","):
+                if DDL._is_punctuation_end_of_expression(idx, content):
+                    expressions.append(expression_)
+                    expression_ = []
+
+            else:
+                expression_.append(subtkn)
+
+        if expression_:
+            expressions.append(expression_)
+
+        return expressions
+
     def _break_down_statement_(self, stmt: TokenList) -> Tuple[str, List[List[Token]]]:
         relation_name = None
         expressions = []
@@ -144,29 +316,49 @@ class DDL:
 
             if isinstance(tkn, Parenthesis):
                 content = DDL._get_parenthesis_content(tkn)
-                expression_ = []
+                expressions += DDL._split_table_elements(content)
 
-                for subtkn in content:
-                    if subtkn.match(Comment.Single, None):
-                        continue
+        return relation_name, expressions
 
-                    if DDL._is_end_of_parentesis_content(subtkn, content):
-                        expression_.append(subtkn)
-                        expressions.append(expression_)
-                        expression_ = []
+    def _break_down_create_table(
+        self, stmt: Statement
+    ) -> Tuple[str, List[List[Token]]]:
+        """Breaks down the ungrouped statement, falling back to sqlparse's grouping if needed."""
 
-                    elif subtkn.match(Punctuation, ","):
-                        if DDL._is_punctuation_end_of_expression(subtkn, content):
-                            expressions.append(expression_)
-                            expression_ = []
+        if self._fast_path:
+            try:
+                relation_name, content = fast_parser.break_down_create_table(stmt)
+                return relation_name, DDL._split_table_elements(content)
 
-                    else:
-                        expression_.append(subtkn)
+            except UnsupportedSyntaxException as e:
+                logger.debug(f"Falling back to sqlparse for statement ({e}): <{stmt}>")
 
-        return relation_name, expressions
+        return self._break_down_statement_(grouping.group(stmt))
+
+    def _classify_in_parallel(
+        self, ddl_script: Union[str, TextIO], workers: int
+    ) -> Iterator[RelationRecord]:
+        """Parses and classifies chunks of the script in a process pool.
+
+        Relations only come back as records, so `relation_details` stays empty.
+        """
 
-    def _break_down_statements(self) -> Dict[str, List[List[Token]]]:
-        """Parses table statements into table name and column expressions.
+        if isinstance(ddl_script, TextIOBase):
+            ddl_script = ddl_script.read()
+
+        chunks = fast_parser.chunk_script(ddl_script, workers * CHUNKS_PER_WORKER)
+        logger.info(f"Parsing {len(chunks)} chunks with {workers} worker processes")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for records in executor.map(
+                _classify_chunk, chunks, repeat(self._fast_path)
+            ):
+                yield from records
+
+    def _break_down_statements(
+        self, ddl_script: Union[str, TextIO]
+    ) -> Iterator[Tuple[str, List[List[Token]]]]:
+        """Parses table statements into table name and column expressions one statement at a time.
 
         ```
         <table definition> ::=
@@ -220,40 +412,29 @@ class DDL:
         Token.Punctuation:  parenthesis
         """
 
-        relation_details = {}
+        for stmt in self._stream_statements(ddl_script, self._fast_path):
+            relation_name, expressions = self._break_down_create_table(stmt)
 
-        for stmt in self._parsed:
-            if not self._is_create_table_statement(stmt):
+            if relation_name is None:
                 logger.warning(
-                    f"Skipping the following statement as it does not seem to be a DDL 'CREATE TABLE' statement: <{str(stmt)}>"
+                    f"Skipping the following statement since it does not contain a relation name: <{str(stmt)}>"
                 )
                 continue
 
-            relation_name, expressions = self._break_down_statement_(stmt)
-
             # needed for official W3C test cases (using quotes is not valid SQL sytax)
             relation_name = relation_name.strip('"')
             #
 
-            if relation_name is None:
-                logger.warning(
-                    f"Skipping the following statement since it does not contain a relation name: <{str(stmt)}>"
-                )
-
-            # elif not is_valid_identifier(relation_name):
+            # if not is_valid_identifier(relation_name):
             #     logger.warning(
             #         f"Skipping the following statement since <{relation_name}> is not a valid SQL identifier: <{str(stmt)}>"
             #     )
+            #     continue
 
-            else:
-                relation_details[relation_name] = expressions
+            yield relation_name, expressions
 
-        return relation_details
 
-    def _break_down_relations(self) -> List[Relation]:
-        """TODO"""
+def _classify_chunk(ddl_script: str, fast_path: bool) -> List[RelationRecord]:
+    """Worker entry point of `DDL._classify_in_parallel`."""
 
-        return [
-            Relation(self, rel_name, expressions)
-            for rel_name, expressions in self.relation_details.items()
-        ]
+    return [rel.to_record() for rel in DDL(ddl_script, fast_path).relations]
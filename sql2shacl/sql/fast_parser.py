@@ -0,0 +1,310 @@
+"""
+Copyright 2024 Lukas Kubelka and Xuemin Duan
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+import re
+from functools import lru_cache
+from io import TextIOBase
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+from sqlparse import keywords
+from sqlparse.engine.statement_splitter import StatementSplitter
+from sqlparse.lexer import Lexer
+from sqlparse.sql import Statement, Token
+from sqlparse.tokens import Comment, Error, Keyword, Name, Punctuation, String
+from sqlparse.tokens import Whitespace, _TokenType
+from ..utils.exceptions import UnsupportedSyntaxException
+
+
+def _renumber_backreferences(regex: str, offset: int) -> str:
+    """Shifts numbered backreferences of `regex` by `offset` groups."""
+
+    return re.sub(
+        r"(?<!\\)((?:\\\\)*)\\(\d+)",
+        lambda m: f"{m.group(1)}(?:\\{int(m.group(2)) + offset})",
+        regex,
+    )
+
+
+# the flags `sqlparse.lexer.Lexer.set_SQL_REGEX` compiles the regexes with
+_SQL_REGEX_FLAGS = re.compile("", re.IGNORECASE | re.UNICODE).flags
+
+
+@lru_cache(maxsize=4)
+def _compile_master_regex(
+    sql_regex: Tuple[Tuple[re.Pattern, object], ...]
+) -> Optional[Tuple[re.Pattern, List[object]]]:
+    """Joins the compiled regexes of a lexer's `SQL_REGEX` into one alternation.
+
+    The alternatives keep the lexer's order, and the first alternative
+    matching at a position wins, just like in `sqlparse.lexer.Lexer.get_tokens`.
+    So the token stream is the same, but each token costs one match instead of
+    trying every regex in turn. Returns None if the regexes cannot be joined,
+    e.g. since they were compiled with other flags.
+    """
+
+    alternatives = []
+    actions = []
+    n_groups = 0
+
+    for pattern, action in sql_regex:
+        if pattern.flags != _SQL_REGEX_FLAGS:
+            return None
+
+        alternatives.append(
+            f"(?P<g{len(actions)}>"
+            f"{_renumber_backreferences(pattern.pattern, n_groups + 1)})"
+        )
+        actions.append(action)
+        n_groups += pattern.groups + 1
+
+    try:
+        return re.compile("|".join(alternatives), _SQL_REGEX_FLAGS), actions
+
+    except re.error:
+        return None
+
+
+def _master_regex(lexer: Lexer) -> Optional[Tuple[re.Pattern, List[object]]]:
+    """Returns the joined regexes of `lexer`, which may have been customized."""
+
+    sql_regex = []
+    for rexmatch, action in lexer._SQL_REGEX:
+        pattern = getattr(rexmatch, "__self__", None)
+        if not isinstance(pattern, re.Pattern):
+            return None
+
+        sql_regex.append((pattern, action))
+
+    return _compile_master_regex(tuple(sql_regex))
+
+
+_TABLE_SCOPE_KEYWORDS = ("GLOBAL", "LOCAL", "TEMPORARY", "TEMP")
+
+# keywords that make sqlparse's StatementSplitter track blocks
+_BLOCK_KEYWORDS = ("BEGIN", "DECLARE", "END", "GO")
+
+# comments, quoted text and dollar-quoted bodies are matched as a whole,
+# so that only semicolons between statements are left over
+_CHUNK_SCAN_REGEX = re.compile(
+    r"--[^\r\n]*|/\*[\s\S]*?\*/|'(?:''|\\'|[^'])*'|\"(?:\"\"|[^\"])*\""
+    r"|(?<![\w$])(\$(?:[A-Za-z_]\w*)?\$)[\s\S]*?\1|;"
+)
+_CREATE_REGEX = re.compile(r"\s*CREATE\b", re.IGNORECASE)
+
+
+def tokenize(ddl_script: Union[str, TextIO]) -> Iterator[Tuple[_TokenType, str]]:
+    """Yields the same `(ttype, value)` pairs as `sqlparse.lexer.tokenize`.
+
+    The regexes are those of sqlparse's default lexer, including any customization,
+    which is tokenized by sqlparse itself if its regexes cannot be joined.
+    """
+
+    if isinstance(ddl_script, TextIOBase):
+        ddl_script = ddl_script.read()
+
+    lexer = Lexer.get_default_instance()
+    master_regex = _master_regex(lexer)
+    if master_regex is None:
+        yield from lexer.get_tokens(ddl_script)
+        return
+
+    regex, actions = master_regex
+    is_keyword = lexer.is_keyword
+    match = regex.match
+    pos = 0
+    end = len(ddl_script)
+
+    while pos < end:
+        m = match(ddl_script, pos)
+
+        if m is None:
+            yield Error, ddl_script[pos]
+            pos += 1
+            continue
+
+        action = actions[int(m.lastgroup[1:])]
+        value = m.group(m.lastgroup)
+
+        if action is keywords.PROCESS_AS_KEYWORD:
+            yield is_keyword(value)
+        else:
+            yield action, value
+
+        pos = m.end()
+
+
+def split_statements(stream: Iterable[Tuple[_TokenType, str]]) -> Iterator[Statement]:
+    """Yields the same statements as `sqlparse.engine.statement_splitter.StatementSplitter`.
+
+    Statements are split at semicolons outside of parentheses. As soon as a statement
+    contains a keyword that opens or closes a block (e.g. `BEGIN ... END`),
+    the rest of the stream is handed over to sqlparse's splitter.
+    """
+
+    stream = iter(stream)
+    is_keyword = {}
+    tokens = []
+    level = 0
+    consume_ws = False
+
+    for ttype, value in stream:
+        if consume_ws:
+            if ttype is Whitespace or ttype is Comment.Single:
+                tokens.append((ttype, value))
+                continue
+
+            yield Statement([Token(*tkn) for tkn in tokens])
+            tokens = []
+            level = 0
+            consume_ws = False
+
+        if ttype not in is_keyword:
+            is_keyword[ttype] = ttype in Keyword
+
+        if is_keyword[ttype] and value.split()[0].upper() in _BLOCK_KEYWORDS:
+            remaining = chain(tokens, [(ttype, value)], stream)
+            yield from StatementSplitter().process(remaining)
+            return
+
+        tokens.append((ttype, value))
+
+        if ttype is Punctuation:
+            if value == "(":
+                level += 1
+
+            elif value == ")":
+                level -= 1
+
+            elif value == ";" and level <= 0:
+                consume_ws = True
+
+    if tokens and not all(ttype in Whitespace for ttype, _ in tokens):
+        yield Statement([Token(*tkn) for tkn in tokens])
+
+
+def chunk_script(ddl_script: str, n_chunks: int) -> List[str]:
+    """Cuts the script into about `n_chunks` pieces of whole statements.
+
+    Pieces are only cut behind a semicolon that is followed by a `CREATE` statement,
+    and the script is scanned without tokenizing it, so chunking is cheap
+    compared to parsing the pieces.
+    """
+
+    target_size = len(ddl_script) // max(n_chunks, 1) + 1
+    chunks = []
+    start = 0
+
+    for m in _CHUNK_SCAN_REGEX.finditer(ddl_script):
+        if m.group() != ";":
+            continue
+
+        end = m.end()
+        if end - start >= target_size and _CREATE_REGEX.match(ddl_script, end):
+            chunks.append(ddl_script[start:end])
+            start = end
+
+    chunks.append(ddl_script[start:])
+
+    return chunks
+
+
+def _skip_whitespace(tokens: List[Token], idx: int) -> int:
+    while idx < len(tokens) and tokens[idx].ttype in Whitespace:
+        idx += 1
+
+    return idx
+
+
+def break_down_create_table(stmt: Statement) -> Tuple[str, List[Token]]:
+    """Returns the relation name and the table element list tokens of an ungrouped statement.
+
+    Only the plain form is recognized:
+        ```
+        CREATE [ <table scope> ] TABLE <table name> ( <table element list> ) [ ; ]
+        ```
+
+    Anything else, e.g. comments around the table name or table options
+    behind the table element list, raises an `UnsupportedSyntaxException`
+    so that the caller can fall back to sqlparse's grouping.
+    The returned tokens are the whitespace-free content between the outer
+    parentheses, i.e. what `DDL._get_parenthesis_content` returns for the grouped statement.
+    """
+
+    tokens = stmt.tokens
+    idx = _skip_whitespace(tokens, 0)
+
+    if idx == len(tokens) or tokens[idx].normalized != "CREATE":
+        raise UnsupportedSyntaxException("statement does not start with CREATE")
+
+    idx = _skip_whitespace(tokens, idx + 1)
+    while idx < len(tokens) and tokens[idx].normalized in _TABLE_SCOPE_KEYWORDS:
+        idx = _skip_whitespace(tokens, idx + 1)
+
+    if idx == len(tokens) or not tokens[idx].match(Keyword, "TABLE"):
+        raise UnsupportedSyntaxException("unsupported table scope")
+
+    idx = _skip_whitespace(tokens, idx + 1)
+    name_parts = []
+    while idx < len(tokens):
+        tkn = tokens[idx]
+        expects_name = len(name_parts) % 2 == 0
+
+        if expects_name and (tkn.ttype is Name or tkn.ttype is String.Symbol):
+            name_parts.append(tkn.value)
+
+        elif not expects_name and tkn.match(Punctuation, "."):
+            name_parts.append(tkn.value)
+
+        else:
+            break
+
+        idx += 1
+
+    if not name_parts or len(name_parts) % 2 == 0:
+        raise UnsupportedSyntaxException("unsupported table name")
+
+    idx = _skip_whitespace(tokens, idx)
+    if idx == len(tokens) or not tokens[idx].match(Punctuation, "("):
+        raise UnsupportedSyntaxException("missing table element list")
+
+    content = []
+    depth = 0
+    for idx in range(idx + 1, len(tokens)):
+        tkn = tokens[idx]
+
+        if tkn.ttype is Punctuation:
+            if tkn.value == "(":
+                depth += 1
+
+            elif tkn.value == ")":
+                if depth == 0:
+                    break
+
+                depth -= 1
+
+        if not tkn.is_whitespace:
+            content.append(tkn)
+
+    else:
+        raise UnsupportedSyntaxException("unbalanced parentheses")
+
+    idx = _skip_whitespace(tokens, idx + 1)
+    if idx < len(tokens):
+        if not tokens[idx].match(Punctuation, ";"):
+            raise UnsupportedSyntaxException("unsupported table options")
+
+    return "".join(name_parts), content
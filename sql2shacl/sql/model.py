@@ -0,0 +1,121 @@
+"""
+Copyright 2024 Lukas Kubelka and Xuemin Duan
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+"""Versioned files of the classified schema model.
+
+A model file holds the relation records of a schema as compact JSON, so that a schema
+parsed once can be shaped again, e.g. with another base IRI or mode, without tokenizing
+its SQL script. Records are stored as arrays in the field order of their named tuples.
+"""
+
+import json
+import logging
+from typing import IO, Iterable, List, Union
+from .record import ColumnRecord, ConstraintRecord, ReferenceRecord, RelationRecord
+from ..utils.exceptions import UnsupportedModelException
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT = "sql2shacl-model"
+
+# to be increased whenever the records change, so that older files are rejected
+MODEL_VERSION = 1
+
+
+def _column_from_json(column: list) -> ColumnRecord:
+    # most columns reference nothing, and are built without unpacking their fields
+    if column[4] is None:
+        return ColumnRecord._make(column)
+
+    name, data_type, unique, not_null, reference = column
+    return ColumnRecord(name, data_type, unique, not_null, ReferenceRecord(*reference))
+
+
+def _constraint_from_json(constraint: list) -> ConstraintRecord:
+    kind, name, column_names, referenced_relation_name, referenced_column_names = (
+        constraint
+    )
+    return ConstraintRecord(
+        kind,
+        name,
+        tuple(column_names),
+        referenced_relation_name,
+        tuple(referenced_column_names),
+    )
+
+
+def dump_records(records: Iterable[RelationRecord], destination: Union[str, IO[str]]):
+    """Writes `records` as a model file to `destination`, a file path or a text stream."""
+
+    # named tuples are serialized as arrays by the json module
+    model = {
+        "format": MODEL_FORMAT,
+        "version": MODEL_VERSION,
+        "relations": list(records),
+    }
+
+    if isinstance(destination, str):
+        with open(destination, "w", encoding="utf-8") as f:
+            json.dump(model, f, separators=(",", ":"))
+
+    else:
+        json.dump(model, destination, separators=(",", ":"))
+
+
+def load_records(source: Union[str, IO[str]]) -> List[RelationRecord]:
+    """Returns the relation records of the model file `source`, a file path or a text stream.
+
+    Raises an `UnsupportedModelException` if `source` is not a well-formed model file
+    of this version.
+    """
+
+    try:
+        if isinstance(source, str):
+            with open(source, encoding="utf-8") as f:
+                model = json.load(f)
+
+        else:
+            model = json.load(source)
+
+    # raised for undecodable text as well as for invalid JSON
+    except ValueError as e:
+        raise UnsupportedModelException(f"Not a model file: {e}") from e
+
+    if not isinstance(model, dict) or model.get("format") != MODEL_FORMAT:
+        raise UnsupportedModelException("Not a model file")
+
+    if model.get("version") != MODEL_VERSION:
+        raise UnsupportedModelException(
+            f"Model file version {model.get('version')} is not supported, "
+            f"expected version {MODEL_VERSION}"
+        )
+
+    try:
+        records = [
+            RelationRecord(
+                name,
+                tuple(map(_column_from_json, columns)),
+                tuple(map(_constraint_from_json, table_constraints)),
+            )
+            for name, columns, table_constraints in model["relations"]
+        ]
+
+    except (LookupError, TypeError, ValueError) as e:
+        raise UnsupportedModelException(f"Malformed model file: {e!r}") from e
+
+    logger.info(f"Loaded {len(records)} relations from the model file")
+    return records
@@ -0,0 +1,52 @@
+"""
+Copyright 2024 Lukas Kubelka and Xuemin Duan
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+"""Plain, picklable records of the classified schema model.
+
+A record holds what classification produced for a relation, column or constraint,
+but no sqlparse tokens and no back-references, so it can be sent between processes.
+"""
+
+from typing import NamedTuple, Optional, Tuple
+
+
+class ReferenceRecord(NamedTuple):
+    name: str
+    referenced_relation_name: str
+    referenced_column_name: str
+
+
+class ColumnRecord(NamedTuple):
+    name: str
+    data_type: str
+    unique: bool
+    not_null: bool
+    reference: Optional[ReferenceRecord]
+
+
+class ConstraintRecord(NamedTuple):
+    kind: str
+    name: str
+    column_names: Tuple[str, ...]
+    referenced_relation_name: Optional[str] = None
+    referenced_column_names: Tuple[str, ...] = ()
+
+
+class RelationRecord(NamedTuple):
+    name: str
+    columns: Tuple[ColumnRecord, ...]
+    table_constraints: Tuple[ConstraintRecord, ...]
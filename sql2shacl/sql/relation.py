@@ -18,8 +18,10 @@ limitations under the License.
 from __future__ import annotations
 
 import logging
+import sys
 from typing import List, Tuple, Union, Dict, TYPE_CHECKING
 from collections import defaultdict
+from functools import wraps
 from itertools import chain
 from sqlparse.sql import Token
 from sqlparse.tokens import Name, Keyword, String, Comment
@@ -30,7 +32,9 @@ from .constraint import (
     TablePrimaryKey,
     TableUnique,
     ColumnForeignKey,
+    TABLE_CONSTRAINT_CLASSES,
 )
+from .record import RelationRecord
 
 if TYPE_CHECKING:
     from .ddl import DDL
@@ -38,8 +42,39 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+def _memoized_property(func):
+    """Property computed once and kept in the relation's `_memo`.
+
+    The memoized properties only depend on the columns and table constraints of the
+    relation, which do not change once it is classified. They return tuples, so that
+    a caller cannot change the memoized value.
+    """
+
+    key = func.__name__
+
+    @wraps(func)
+    def getter(self):
+        try:
+            return self._memo[key]
+
+        except KeyError:
+            value = self._memo[key] = func(self)
+            return value
+
+    return property(getter)
+
+
 class Relation:
 
+    __slots__ = (
+        "_rel_manager",
+        "_name",
+        "_memo",
+        "_cols",
+        "_cols_by_name",
+        "_tab_constraints",
+    )
+
     def __init__(
         self,
         rel_manager: DDL,
@@ -48,9 +83,35 @@ class Relation:
     ):
         self._rel_manager = rel_manager
         logger.info(f"Identified relation <{rel_name}>")
-        self._name = rel_name
-        self._expressions = expressions
-        self._cols, self._tab_constraints = self._classify_expressions()
+        self._name = sys.intern(rel_name)
+        self._memo = {}
+        self._cols, self._tab_constraints = self._classify_expressions(expressions)
+        self._cols_by_name = self._index_columns(self._cols)
+
+    @classmethod
+    def from_record(cls, rel_manager: DDL, record: RelationRecord) -> Relation:
+        """Returns the relation described by `record` without classifying any tokens."""
+
+        rel = cls.__new__(cls)
+        rel._rel_manager = rel_manager
+        rel._name = sys.intern(record.name)
+        rel._memo = {}
+        rel._cols = [Column.from_record(rel, col) for col in record.columns]
+        rel._cols_by_name = cls._index_columns(rel._cols)
+        rel._tab_constraints = [
+            TABLE_CONSTRAINT_CLASSES[constraint.kind].from_record(rel, constraint)
+            for constraint in record.table_constraints
+        ]
+        return rel
+
+    def to_record(self) -> RelationRecord:
+        """Returns a picklable record of the classified relation."""
+
+        return RelationRecord(
+            self.name,
+            tuple(col.to_record() for col in self.columns),
+            tuple(constraint.to_record() for constraint in self.table_constraints),
+        )
 
     @property
     def name(self) -> str:
@@ -76,33 +137,33 @@ class Relation:
 
         return len(self.columns)
 
-    @property
-    def column_names(self) -> List[str]:
+    @_memoized_property
+    def column_names(self) -> Tuple[str, ...]:
         """TODO"""
 
-        return [col.name for col in self.columns]
+        return tuple(col.name for col in self.columns)
 
-    @property
-    def references_column_constraints(self) -> List[ColumnForeignKey]:
+    @_memoized_property
+    def references_column_constraints(self) -> Tuple[ColumnForeignKey, ...]:
         """TODO"""
 
-        return [col.reference for col in self.columns if col.has_reference]
+        return tuple(col.reference for col in self.columns if col.has_reference)
 
-    @property
-    def foreign_key_table_constraints(self) -> List[TableForeignKey]:
+    @_memoized_property
+    def foreign_key_table_constraints(self) -> Tuple[TableForeignKey, ...]:
         """TODO"""
 
-        return [
+        return tuple(
             constraint
             for constraint in self.table_constraints
             if isinstance(constraint, TableForeignKey)
-        ]
+        )
 
-    @property
-    def referenced_relation_names(self) -> List[Union[str, None]]:
-        """Returns a list of distinct referenced relation names."""
+    @_memoized_property
+    def referenced_relation_names(self) -> Tuple[Union[str, None], ...]:
+        """Returns the distinct referenced relation names."""
 
-        return list(
+        return tuple(
             {
                 constraint.referenced_relation_name
                 for constraint in (
@@ -121,7 +182,7 @@ class Relation:
 
         return False
 
-    @property
+    @_memoized_property
     def primary_key_tab_constraint(self) -> Union[TablePrimaryKey, None]:
         """Returns the `PRIMARY KEY` table constraint if existing."""
 
@@ -145,12 +206,12 @@ class Relation:
         """TODO"""
 
         if self.primary_key_tab_constraint is not None:
-            if self.primary_key_tab_constraint.column_names == self.column_names:
+            if tuple(self.primary_key_tab_constraint.column_names) == self.column_names:
                 return True
 
         return False
 
-    @property
+    @_memoized_property
     def do_all_columns_reference(self) -> bool:
         """TODO"""
 
@@ -182,19 +243,29 @@ class Relation:
         """TODO"""
 
         for constraint in self.foreign_key_table_constraints:
-            if constraint.column_names == self.column_names:
+            if tuple(constraint.column_names) == self.column_names:
                 return True
 
         return False
 
     def get_column_by_name(self, col_name: str) -> Column:
-        """TODO"""
+        """Returns the column named `col_name`, given in quoted or unquoted form."""
 
-        for col in self.columns:
-            if col.name == col_name:
-                return col
+        col = self._cols_by_name.get(col_name)
+        if col is None:
+            col = self._cols_by_name.get(col_name.strip('"'))
 
-        return None
+        return col
+
+    @staticmethod
+    def _index_columns(cols: List[Column]) -> Dict[str, Column]:
+        """Returns a dict from column name to column, keeping the first of duplicate names."""
+
+        cols_by_name = {}
+        for col in cols:
+            cols_by_name.setdefault(col.name, col)
+
+        return cols_by_name
 
     def _prepare_foreign_key_references_per_column(
         self,
@@ -307,7 +378,7 @@ class Relation:
         return False
 
     def _classify_expressions(
-        self,
+        self, expressions: List[List[Token]]
     ) -> Tuple[List[Column], List[Constraint]]:
         """
         ```
@@ -359,7 +430,7 @@ class Relation:
         cols = []
         tab_constraints = []
 
-        for expression_ in self._expressions:
+        for expression_ in expressions:
             first_tkn = expression_[0]
             other_tkns = expression_[1:]
 
@@ -32,3 +32,21 @@ class ColumnNotFoundException(Exception):
     """Raised when the column of a UNIQUE/ PRIMARY KEY table constraint does not exist in the relation."""
 
     pass
+
+
+class UnsupportedSyntaxException(Exception):
+    """Raised when the fast-path parser meets a statement it does not recognize."""
+
+    pass
+
+
+class RewriterBusyException(Exception):
+    """Raised when a session already has as many pending asynchronous rewrites as it accepts."""
+
+    pass
+
+
+class UnsupportedModelException(Exception):
+    """Raised when a file is not a schema model file of the supported version."""
+
+    pass
@@ -16,10 +16,27 @@ limitations under the License.
 """
 
 import logging
+import threading
 from logging.config import dictConfig
 
+# `dictConfig` replaces the handlers of the root logger, which other threads may be
+# logging through, so it runs under a lock and only when the settings change
+_setup_lock = threading.Lock()
+_current_settings = None
+
 
 def setup_logging(log_level=logging.INFO, log_file=None):
+    global _current_settings
+
+    with _setup_lock:
+        if _current_settings == (log_level, log_file):
+            return
+
+        _configure_logging(log_level, log_file)
+        _current_settings = (log_level, log_file)
+
+
+def _configure_logging(log_level, log_file):
     handlers = {}
 
     if not log_file:
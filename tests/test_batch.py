@@ -0,0 +1,82 @@
+import os
+import signal
+import pytest
+import sql2shacl
+from concurrent.futures.process import BrokenProcessPool
+from rdflib import Graph
+from rdflib.compare import isomorphic
+from sql2shacl import batch
+from sql2shacl.utils.exceptions import MissingSQLDatatypeException
+
+SCRIPTS = [
+    "CREATE TABLE Emp (id integer PRIMARY KEY, boss integer REFERENCES Emp (id));",
+    "CREATE TABLE t (a);",
+    "CREATE TABLE Dept (id integer NOT NULL, name varchar(20) UNIQUE);",
+]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_rewrite_many_reports_errors_per_script(workers):
+    results = list(sql2shacl.rewrite_many(SCRIPTS, workers=workers))
+
+    assert [result.index for result in results] == [0, 1, 2]
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, MissingSQLDatatypeException)
+
+    for result in (results[0], results[2]):
+        assert isomorphic(
+            Graph().parse(data=result.shapes, format="ttl"),
+            Graph().parse(data=sql2shacl.rewrite(SCRIPTS[result.index]), format="ttl"),
+        )
+
+
+def test_rewrite_many_streams_results_as_they_complete():
+    results = sql2shacl.rewrite_many(SCRIPTS, workers=2, format="nt", ordered=False)
+
+    assert sorted(result.index for result in results) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_rewrite_many_submits_a_bounded_window_of_scripts(ordered):
+    consumed = []
+
+    def scripts():
+        for idx in range(12):
+            consumed.append(idx)
+            yield f"CREATE TABLE t_{idx} (a integer);"
+
+    results = sql2shacl.rewrite_many(scripts(), workers=2, ordered=ordered)
+    first = next(results)
+
+    # two scripts per worker in flight, and the next one submitted for the first result
+    assert len(consumed) == 5
+    rest = list(results)
+    assert sorted(result.index for result in [first, *rest]) == list(range(12))
+    if ordered:
+        assert [result.index for result in [first, *rest]] == list(range(12))
+
+
+def _rewrite_or_die(sql: str) -> str:
+    # stands in for a worker killed, e.g. for running out of memory
+    if "killed" in sql:
+        os.kill(os.getpid(), signal.SIGKILL)
+
+    return batch._worker_session.rewrite(sql)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_rewrite_many_reports_the_scripts_of_a_broken_pool(monkeypatch, ordered):
+    monkeypatch.setattr(batch, "_rewrite_in_worker", _rewrite_or_die)
+    scripts = [f"CREATE TABLE t_{idx} (a integer);" for idx in range(20)]
+    scripts[2] = "CREATE TABLE killed (a integer);"
+
+    results = list(sql2shacl.rewrite_many(scripts, workers=2, ordered=ordered))
+
+    assert sorted(result.index for result in results) == list(range(20))
+    if ordered:
+        assert [result.index for result in results] == list(range(20))
+    by_index = {result.index: result for result in results}
+    assert isinstance(by_index[2].error, BrokenProcessPool)
+    assert all(
+        result.ok or isinstance(result.error, BrokenProcessPool) for result in results
+    )
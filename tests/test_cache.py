@@ -0,0 +1,104 @@
+import os
+import sql2shacl.session
+from sql2shacl import ResultCache, RewriterSession
+from sql2shacl.cache import normalize_sql
+from sql2shacl.cli import main
+
+SQL = "CREATE TABLE Emp (id integer PRIMARY KEY, boss integer REFERENCES Emp (id));"
+
+
+def test_hits_are_served_without_parsing(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path))
+    session = RewriterSession(log_level=None, cache=cache)
+    shapes = session.rewrite(SQL)
+
+    def no_parsing(*args, **kwargs):
+        raise AssertionError("parsed on a cache hit")
+
+    monkeypatch.setattr(sql2shacl.session.DDL, "__init__", no_parsing)
+    reformatted = SQL.replace(" (", "\n    (").replace(", ", ",\n")
+
+    assert session.rewrite(reformatted) == shapes
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert os.listdir(tmp_path) == [
+        ResultCache.key(SQL, "w3c", session.base_iri, "ttl") + ".shapes"
+    ]
+
+
+def test_settings_are_part_of_the_key():
+    keys = {
+        ResultCache.key(SQL, "w3c", "http://a/", "ttl"),
+        ResultCache.key(SQL, "thapa", "http://a/", "ttl"),
+        ResultCache.key(SQL, "w3c", "http://b/", "ttl"),
+        ResultCache.key(SQL, "w3c", "http://a/", "nt"),
+        ResultCache.key(SQL.replace("Emp", "emp"), "w3c", "http://a/", "ttl"),
+    }
+
+    assert len(keys) == 5
+
+
+def test_normalization_keeps_quotes_and_comments():
+    assert normalize_sql("CREATE  TABLE\n\t\"a  b\" ('x  y');") == (
+        "CREATE TABLE \"a  b\" ('x  y');"
+    )
+    # a line comment must not swallow the statement behind it
+    assert normalize_sql("-- t\nCREATE TABLE t (a int);") != normalize_sql(
+        "-- t CREATE TABLE t (a int);"
+    )
+
+
+def test_normalization_keeps_scripts_with_backslashes():
+    escaped = "CREATE TABLE t (a varchar DEFAULT 'it\\'s  x');"
+
+    assert normalize_sql(escaped) == escaped
+    assert normalize_sql(escaped) != normalize_sql(escaped.replace("  ", " "))
+    assert normalize_sql("-- t\r\nCREATE TABLE t (a int);\r\n") == normalize_sql(
+        "-- t\nCREATE TABLE t (a int);\n"
+    )
+
+
+def test_directory_is_scanned_only_when_over_max_bytes(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path), max_bytes=35)
+    cache.put("a", "x" * 10)
+    scans = []
+    evict = cache._evict
+    monkeypatch.setattr(cache, "_evict", lambda: scans.append(1) or evict())
+
+    cache.put("b", "x" * 10)
+    cache.put("b", "x" * 20)
+    assert not scans
+
+    cache.put("c", "x" * 10)
+    assert scans == [1]
+    assert sorted(os.listdir(tmp_path)) == ["b.shapes", "c.shapes"]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=25)
+    for key in ("a", "b"):
+        cache.put(key, "x" * 10)
+
+    os.utime(tmp_path / "a.shapes", ns=(1, 1))
+    os.utime(tmp_path / "b.shapes", ns=(2, 2))
+    assert cache.get("a") == "x" * 10
+    cache.put("c", "x" * 10)
+
+    assert sorted(os.listdir(tmp_path)) == ["a.shapes", "c.shapes"]
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cli_reuses_the_cache_dir(tmp_path):
+    sql_file = tmp_path / "create.sql"
+    sql_file.write_text(SQL)
+    cache_dir = tmp_path / "cache"
+    outputs = []
+
+    for idx in range(2):
+        out_file = tmp_path / f"shapes_{idx}.ttl"
+        args = [str(sql_file), "--cache-dir", str(cache_dir), "-o", str(out_file)]
+        assert main(args) == 0
+        outputs.append(out_file.read_text())
+
+    assert outputs[0] == outputs[1]
+    assert len(os.listdir(cache_dir)) == 1
@@ -0,0 +1,162 @@
+import os
+import stat
+import subprocess
+import sys
+import pytest
+import sql2shacl
+from rdflib import Graph
+from rdflib.compare import isomorphic
+from sql2shacl.cli import main
+
+HEAVY_MODULES = ("rdflib", "sqlparse", "sql2shacl.constraint_rewriter")
+
+
+def _imported_modules(*args: str):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "sql2shacl", *args],
+        capture_output=True,
+        text=True,
+    )
+    return {
+        line.split("|")[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+@pytest.mark.parametrize("args", [("--help",), ("--version",)])
+def test_cold_cli_does_not_import_heavy_dependencies(args):
+    modules = _imported_modules(*args)
+
+    assert "sql2shacl.cli" in modules
+    assert not [name for name in HEAVY_MODULES if name in modules]
+
+
+def test_submodules_are_imported_on_first_access():
+    assert sql2shacl.cr.ConstraintRewriter is not None
+    assert issubclass(sql2shacl.exceptions.MissingSQLDatatypeException, Exception)
+
+    with pytest.raises(AttributeError):
+        sql2shacl.missing
+
+
+def test_cli_streams_ntriples_to_outfile(tmp_path):
+    out_file = tmp_path / "shapes.nt"
+    args = ["--format", "nt", "-o", str(out_file), "tests/ddl/paper_example.sql"]
+
+    assert main(args) == 0
+
+    with open(out_file, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines and all(line.endswith(" .") for line in lines)
+    assert len(lines) == len(set(lines))
+
+
+def test_cli_reports_failed_rewrites(tmp_path, capsys):
+    sql_file = tmp_path / "create.sql"
+    sql_file.write_text("CREATE TABLE t (a);")
+
+    assert main([str(sql_file), "--loglevel", "ERROR"]) == 1
+    assert "[ERROR] Failed to rewrite" in capsys.readouterr().err
+
+
+def test_cli_rewrites_a_saved_model_without_the_script(tmp_path):
+    model_file = tmp_path / "schema.model"
+    first, second = tmp_path / "w3c.ttl", tmp_path / "thapa.ttl"
+    sql_args = ["--save-model", str(model_file), "tests/ddl/paper_example.sql"]
+
+    assert main([*sql_args, "-o", str(first)]) == 0
+    assert main(["--model", str(model_file), "--mode", "thapa", "-o", str(second)]) == 0
+
+    with open("tests/ddl/paper_example.sql", encoding="utf-8") as f:
+        expected = sql2shacl.rewrite(
+            f, base_iri="http://example.com/base/", mode="thapa"
+        )
+    assert isomorphic(
+        Graph().parse(second, format="ttl"), Graph().parse(data=expected, format="ttl")
+    )
+
+
+def test_cli_reports_unsupported_models(tmp_path, capsys):
+    model_file = tmp_path / "schema.model"
+    model_file.write_text("{}")
+
+    assert main(["--model", str(model_file)]) == 1
+    assert "[ERROR] Failed to load" in capsys.readouterr().err
+
+
+def test_cli_rejects_saving_a_loaded_model(tmp_path):
+    model_file = str(tmp_path / "schema.model")
+
+    with pytest.raises(SystemExit):
+        main(["--model", model_file, "--save-model", model_file])
+
+
+def test_cli_reports_malformed_models(tmp_path, capsys):
+    model_file = tmp_path / "schema.model"
+    model_file.write_text('{"format": "sql2shacl-model", "version": 1, "relations": 1}')
+
+    assert main(["--model", str(model_file)]) == 1
+    assert "[ERROR] Failed to load" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("format", ["ttl", "nt"])
+def test_cli_leaves_no_outfile_after_failed_rewrites(tmp_path, format):
+    sql_file = tmp_path / "create.sql"
+    sql_file.write_text("CREATE TABLE t (a integer);\nCREATE TABLE u (b);")
+    out_file = tmp_path / "shapes.out"
+    args = [str(sql_file), "--format", format, "-o", str(out_file)]
+
+    assert main([*args, "--loglevel", "ERROR"]) == 1
+    assert not out_file.exists()
+
+
+@pytest.mark.parametrize("format", ["ttl", "nt"])
+def test_cli_keeps_an_existing_outfile_after_failed_rewrites(tmp_path, format):
+    sql_file = tmp_path / "create.sql"
+    sql_file.write_text("CREATE TABLE t (a integer);\nCREATE TABLE u (b);")
+    out_file = tmp_path / "shapes.out"
+    out_file.write_text("previous shapes")
+    args = [str(sql_file), "--format", format, "-o", str(out_file)]
+
+    assert main([*args, "--loglevel", "ERROR"]) == 1
+    assert out_file.read_text() == "previous shapes"
+    assert sorted(os.listdir(tmp_path)) == ["create.sql", "shapes.out"]
+
+
+def test_cli_replaces_an_existing_outfile_keeping_its_mode(tmp_path):
+    out_file = tmp_path / "shapes.nt"
+    out_file.write_text("previous shapes")
+    out_file.chmod(0o640)
+
+    assert (
+        main(["--format", "nt", "-o", str(out_file), "tests/ddl/paper_example.sql"])
+        == 0
+    )
+    assert "previous shapes" not in out_file.read_text()
+    assert stat.S_IMODE(out_file.stat().st_mode) == 0o640
+    assert sorted(os.listdir(tmp_path)) == ["shapes.nt"]
+
+
+@pytest.mark.parametrize(
+    "sql, exit_code", [("CREATE TABLE t (a integer);", 0), ("CREATE TABLE t (a);", 1)]
+)
+def test_cli_writes_to_devnull_without_removing_it(tmp_path, sql, exit_code):
+    sql_file = tmp_path / "create.sql"
+    sql_file.write_text(sql)
+
+    assert main([str(sql_file), "-o", os.devnull, "--loglevel", "ERROR"]) == exit_code
+
+    assert stat.S_ISCHR(os.stat(os.devnull).st_mode)
+    assert sorted(os.listdir(tmp_path)) == ["create.sql"]
+
+
+def test_cli_rewrites_a_file_named_diff(tmp_path, monkeypatch, capsys):
+    (tmp_path / "diff").write_text("CREATE TABLE t (a integer);")
+    monkeypatch.chdir(tmp_path)
+
+    assert main(["./diff", "--format", "nt"]) == 0
+    assert "<http://example.com/base/t>" in capsys.readouterr().out
+
+    with pytest.raises(SystemExit):
+        main(["diff"])
@@ -0,0 +1,338 @@
+import io
+import json
+import pickle
+import sys
+import pytest
+from sqlparse.engine import grouping
+from sqlparse.sql import Token
+from sql2shacl.sql import fast_parser
+from sql2shacl.sql import ddl as ddl_module
+from sql2shacl.sql.ddl import DDL
+from sql2shacl.sql.relation import Relation
+from sql2shacl.utils.exceptions import UnsupportedModelException
+from sql2shacl.sql.model import MODEL_VERSION
+from sql2shacl.sql.record import (
+    ColumnRecord,
+    ConstraintRecord,
+    ReferenceRecord,
+    RelationRecord,
+)
+
+PG_DUMP_LIKE = """
+CREATE TABLE Emp (
+    E_id integer PRIMARY KEY,
+    Name varchar NOT NULL
+);
+CREATE INDEX emp_name_idx ON Emp (Name);
+COMMENT ON TABLE Emp IS 'Employees';
+GRANT SELECT ON TABLE Emp TO reporting;
+CREATE TABLE Prj (
+    P_id integer PRIMARY KEY,
+    Lead integer REFERENCES Emp (E_id)
+);
+"""
+
+
+def test_only_create_table_statements_become_relations():
+    ddl = DDL(PG_DUMP_LIKE)
+
+    assert ddl.relation_names == ["Emp", "Prj"]
+    assert [rel.name for rel in ddl.relations] == ["Emp", "Prj"]
+    assert ddl.relations[1].referenced_relation_names == ("Emp",)
+
+
+def test_ddl_accepts_text_stream():
+    from_string = DDL(PG_DUMP_LIKE)
+    from_stream = DDL(io.StringIO(PG_DUMP_LIKE))
+
+    assert from_stream.relation_names == from_string.relation_names
+    for rel, other in zip(from_stream.relations, from_string.relations):
+        assert rel.column_names == other.column_names
+
+
+def test_only_create_table_statements_are_grouped(monkeypatch):
+    grouped = []
+    group_ = grouping.group
+
+    def group(stmt):
+        grouped.append(stmt)
+        return group_(stmt)
+
+    monkeypatch.setattr(ddl_module.grouping, "group", group)
+    DDL(PG_DUMP_LIKE, fast_path=False)
+    assert len(grouped) == 2
+
+    grouped.clear()
+    DDL(PG_DUMP_LIKE)
+    assert len(grouped) == 0
+
+
+def _wide_table_statement(n_columns: int):
+    columns = ",\n".join(f"    col_{idx} integer NOT NULL" for idx in range(n_columns))
+    sql = f"CREATE TABLE Wide (\n{columns},\n    PRIMARY KEY (col_0, col_1)\n);"
+    return grouping.group(next(DDL._stream_statements(sql)))
+
+
+def _split_token_matches(stmt, monkeypatch) -> int:
+    """Returns how often tokens are matched while breaking down `stmt`."""
+
+    n_matches = 0
+    match = Token.match
+
+    def counting_match(*args, **kwargs):
+        nonlocal n_matches
+        n_matches += 1
+        return match(*args, **kwargs)
+
+    with monkeypatch.context() as m:
+        m.setattr(Token, "match", counting_match)
+        DDL("")._break_down_statement_(stmt)
+
+    return n_matches
+
+
+def test_break_down_statement_splits_wide_tables():
+    _, expressions = DDL("")._break_down_statement_(_wide_table_statement(600))
+
+    assert len(expressions) == 601
+    assert [str(tkn) for tkn in expressions[-1]] == [
+        "PRIMARY KEY",
+        "(",
+        "col_0",
+        "col_1",
+        ")",
+    ]
+
+
+def test_break_down_statement_scales_linearly(monkeypatch):
+    # stays below sqlparse's MAX_GROUPING_TOKENS
+    small = _split_token_matches(_wide_table_statement(150), monkeypatch)
+    large = _split_token_matches(_wide_table_statement(900), monkeypatch)
+
+    # 6x the columns: linear splitting matches close to 6x the tokens, quadratic ~36x
+    assert large / small < 7
+
+
+def test_relation_records_round_trip():
+    ddl = DDL(PG_DUMP_LIKE)
+    records = [rel.to_record() for rel in ddl.relations]
+    rebuilt = DDL.from_records(records)
+
+    assert [rel.to_record() for rel in rebuilt.relations] == records
+    assert rebuilt.relations[1].referenced_relation_names == ("Emp",)
+    assert rebuilt.relations[0].primary_key_tab_constraint is None
+    assert rebuilt.relations[0].get_column_by_name("E_id").has_not_null_constraint
+
+
+def test_relation_records_are_picklable():
+    records = [rel.to_record() for rel in DDL(PG_DUMP_LIKE).relations]
+
+    assert pickle.loads(pickle.dumps(records)) == records
+
+
+def test_model_file_round_trip(tmp_path):
+    ddl = DDL(PG_DUMP_LIKE)
+    model_file = str(tmp_path / "schema.model")
+
+    ddl.save(model_file)
+    loaded = DDL.load(model_file)
+
+    assert [rel.to_record() for rel in loaded.relations] == [
+        rel.to_record() for rel in ddl.relations
+    ]
+    assert loaded.referencing_relation_names("Emp") == {"Prj"}
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "CREATE TABLE t (a integer);",
+        '{"format": "other", "version": 1, "relations": []}',
+        '{"format": "sql2shacl-model", "version": %d, "relations": []}'
+        % (MODEL_VERSION + 1),
+    ],
+)
+def test_only_model_files_of_this_version_are_loaded(content):
+    with pytest.raises(UnsupportedModelException):
+        DDL.load(io.StringIO(content))
+
+
+@pytest.mark.parametrize(
+    "relations",
+    [
+        None,
+        [["t", []]],
+        [["t", [["a", "integer"]], []]],
+        [["t", [["a", "integer", False, False, None]], [["CHECK", "c", [], None, []]]]],
+        [[None, [], []]],
+    ],
+)
+def test_malformed_model_files_are_rejected(relations):
+    content = {"format": "sql2shacl-model", "version": MODEL_VERSION}
+    if relations is not None:
+        content["relations"] = relations
+
+    with pytest.raises(UnsupportedModelException):
+        DDL.load(io.StringIO(json.dumps(content)))
+
+
+def test_undecodable_model_files_are_rejected(tmp_path):
+    model_file = tmp_path / "schema.model"
+    model_file.write_bytes(b'{"format": "\xff"}')
+
+    with pytest.raises(UnsupportedModelException):
+        DDL.load(str(model_file))
+
+
+def test_chunk_script_cuts_only_between_statements():
+    sql = "\n".join(
+        f"CREATE TABLE t_{idx} (a varchar(5) DEFAULT ';', b integer); -- ;\n"
+        f"COMMENT ON TABLE t_{idx} IS 'x;y';"
+        for idx in range(40)
+    )
+    chunks = fast_parser.chunk_script(sql, 8)
+
+    assert "".join(chunks) == sql
+    assert len(chunks) > 1
+    assert all(chunk.lstrip().startswith("CREATE TABLE") for chunk in chunks)
+
+
+def test_parallel_parsing_matches_sequential_parsing():
+    sql = "\n".join(
+        PG_DUMP_LIKE.replace("Emp", f"Emp{idx}").replace("Prj", f"Prj{idx}")
+        for idx in range(20)
+    )
+
+    sequential = [rel.to_record() for rel in DDL(sql).relations]
+    parallel = [rel.to_record() for rel in DDL(sql, workers=2).relations]
+
+    assert parallel == sequential
+
+
+def test_is_other_relation_referencing_uses_incoming_foreign_keys():
+    ddl = DDL(
+        PG_DUMP_LIKE
+        + "CREATE TABLE Tree (id integer PRIMARY KEY, up integer REFERENCES Tree (id));"
+    )
+    emp, prj, tree = ddl.relations
+
+    assert ddl.is_other_relation_referencing(emp)
+    assert not ddl.is_other_relation_referencing(prj)
+    assert not ddl.is_other_relation_referencing(tree)
+
+
+def _link_schema_records(n_tables: int):
+    """Returns entity tables E_i and binary link tables L_i between E_i and E_i+1."""
+
+    records = []
+    for idx in range(n_tables // 2):
+        records.append(
+            RelationRecord(
+                f"E_{idx}",
+                (ColumnRecord("id", "integer", True, True, None),),
+                (),
+            )
+        )
+        records.append(
+            RelationRecord(
+                f"L_{idx}",
+                (
+                    ColumnRecord(
+                        "a",
+                        "integer",
+                        False,
+                        False,
+                        ReferenceRecord("", f"E_{idx}", "id"),
+                    ),
+                    ColumnRecord(
+                        "b",
+                        "integer",
+                        False,
+                        False,
+                        ReferenceRecord("", f"E_{idx + 1}", "id"),
+                    ),
+                ),
+                (ConstraintRecord("PRIMARY KEY", "", ("a", "b")),),
+            )
+        )
+
+    return records
+
+
+def _classification_lookups_per_table(n_tables: int, monkeypatch) -> float:
+    """Returns how often referenced relation names are looked up per classified table."""
+
+    ddl = DDL.from_records(_link_schema_records(n_tables))
+    n_lookups = 0
+    referenced_relation_names = Relation.referenced_relation_names.fget
+
+    def counting_referenced_relation_names(rel):
+        nonlocal n_lookups
+        n_lookups += 1
+        return referenced_relation_names(rel)
+
+    with monkeypatch.context() as m:
+        m.setattr(
+            Relation,
+            "referenced_relation_names",
+            property(counting_referenced_relation_names),
+        )
+        n_binary = sum(rel.is_binary() for rel in ddl.relations)
+
+    assert n_binary == n_tables // 2
+    return n_lookups / n_tables
+
+
+def test_thapa_binary_classification_scales_linearly(monkeypatch):
+    small = _classification_lookups_per_table(100, monkeypatch)
+    large = _classification_lookups_per_table(2000, monkeypatch)
+
+    # linear classification keeps the lookups per table flat, quadratic would be ~20x
+    assert large <= small
+
+
+def test_relation_memoizes_derived_properties_as_tuples():
+    ddl = DDL("CREATE TABLE Asg (a integer REFERENCES Emp (id), b integer);")
+    (asg,) = ddl.relations
+
+    assert asg.column_names is asg.column_names
+    assert asg.references_column_constraints is asg.references_column_constraints
+    assert not asg.do_all_columns_reference
+
+    assert asg.column_names == ("a", "b")
+    assert isinstance(asg.referenced_relation_names, tuple)
+    assert isinstance(asg.foreign_key_table_constraints, tuple)
+
+
+def test_get_column_by_name_accepts_quoted_and_unquoted_names():
+    ddl = DDL('CREATE TABLE "Emp" ("E id" integer, name varchar, name integer);')
+    (emp,) = ddl.relations
+
+    assert emp.get_column_by_name("E id") is emp.columns[0]
+    assert emp.get_column_by_name('"E id"') is emp.columns[0]
+    assert emp.get_column_by_name("name") is emp.columns[1]
+    assert emp.get_column_by_name("missing") is None
+
+    (copy,) = DDL.from_records([emp.to_record()]).relations
+    assert copy.get_column_by_name('"E id"') is copy.columns[0]
+
+
+def test_lean_model_releases_parsed_tokens():
+    ddl = DDL(PG_DUMP_LIKE)
+    emp = ddl.relations[0]
+
+    with pytest.raises(RuntimeError):
+        ddl.relation_details
+
+    for obj in [emp, *emp.columns, *emp.table_constraints]:
+        assert not hasattr(obj, "__dict__")
+        assert not hasattr(obj, "_expression")
+        assert not hasattr(obj, "_expressions")
+
+    assert emp.columns[0].name is sys.intern("E_id")
+    assert list(DDL(PG_DUMP_LIKE, keep_parsed=True).relation_details) == ["Emp", "Prj"]
+
+
+def test_parsed_ddl_cannot_be_kept_by_worker_processes():
+    with pytest.raises(ValueError, match="workers=1"):
+        DDL(PG_DUMP_LIKE, workers=2, keep_parsed=True)
@@ -0,0 +1,139 @@
+import os
+import pytest
+import sql2shacl
+from rdflib import Graph
+from sql2shacl.cli import main
+from sql2shacl.constraint_rewriter import ConstraintRewriter, create_iri_builder
+from sql2shacl.delta import _is_component_triple
+from sql2shacl.shacl.shacl_shaper import Shaper
+from sql2shacl.shacl.triple_buffer import TripleBuffer
+from sql2shacl.sql.ddl import DDL
+
+with open(os.path.join("tests", "ddl", "paper_example.sql")) as f:
+    PAPER_EXAMPLE = f.read()
+
+MIGRATIONS = {
+    # Asg is no longer a binary relation in thapa mode
+    "column added": PAPER_EXAMPLE.replace(
+        "ToPrj integer REFERENCES Prj(P_id),",
+        "ToPrj integer REFERENCES Prj(P_id),\n    Hours integer,",
+    ),
+    "unique added": PAPER_EXAMPLE.replace("Post varchar", "Post varchar UNIQUE"),
+    "table added": PAPER_EXAMPLE
+    + "\nCREATE TABLE Rev (R_id integer PRIMARY KEY, ToEmp integer REFERENCES Emp(E_id));",
+    "table removed": PAPER_EXAMPLE.replace(
+        "    ToAcc integer NOT NULL UNIQUE REFERENCES Acc(A_id)\n",
+        "    ToAcc integer\n",
+    ).replace(
+        "CREATE TABLE Acc (\n    A_id integer PRIMARY KEY,\n    Name char UNIQUE\n);",
+        "",
+    ),
+}
+
+TESTCASES = sorted(
+    os.path.join("testcases", testcase_, "create.sql")
+    for testcase_ in os.listdir("testcases")
+    if os.path.isdir(os.path.join("testcases", testcase_))
+)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _full_shapes(sql, mode):
+    shapes = TripleBuffer()
+    iri_builder = create_iri_builder(mode, "http://example.org/base/")
+    Shaper(iri_builder, DDL(sql), shapes, deterministic_b_nodes=True).shape_up()
+    return set(shapes)
+
+
+def _assert_delta_applies(old_sql, new_sql, mode):
+    delta = sql2shacl.diff(old_sql, new_sql, mode=mode)
+    applied = (_full_shapes(old_sql, mode) - set(delta.removed)) | set(delta.added)
+    new_shapes = _full_shapes(new_sql, mode)
+
+    assert new_shapes <= applied
+    assert all(_is_component_triple(triple) for triple in applied - new_shapes)
+    return delta
+
+
+@pytest.mark.parametrize("mode", ["w3c", "thapa"])
+@pytest.mark.parametrize("migration", MIGRATIONS)
+def test_delta_turns_old_shapes_into_new_ones(migration, mode):
+    delta = _assert_delta_applies(PAPER_EXAMPLE, MIGRATIONS[migration], mode)
+
+    assert not delta.is_empty
+    assert len(delta.reshaped) < 5
+
+
+@pytest.mark.parametrize("mode", ["w3c", "thapa"])
+@pytest.mark.parametrize("old, new", list(zip(TESTCASES, TESTCASES[1:])))
+def test_delta_between_testcases(old, new, mode):
+    _assert_delta_applies(_read(old), _read(new), mode)
+
+
+def test_unchanged_relations_are_not_reshaped():
+    delta = sql2shacl.diff(PAPER_EXAMPLE, MIGRATIONS["unique added"], mode="thapa")
+
+    # Emp changed and Asg references it, Acc and Prj are left alone
+    assert delta.reshaped == ("Asg", "Emp")
+    assert sql2shacl.diff(PAPER_EXAMPLE, PAPER_EXAMPLE).is_empty
+
+
+def test_cli_writes_the_delta_as_rdf_patch(tmp_path):
+    old_file, new_file = tmp_path / "old.sql", tmp_path / "new.sql"
+    old_file.write_text(PAPER_EXAMPLE)
+    new_file.write_text(MIGRATIONS["column added"])
+    out_file = tmp_path / "delta.rdfp"
+
+    assert (
+        main(
+            [
+                "diff",
+                str(old_file),
+                str(new_file),
+                "--mode",
+                "thapa",
+                "-o",
+                str(out_file),
+            ]
+        )
+        == 0
+    )
+
+    lines = out_file.read_text().splitlines()
+    assert lines[0] == "TX ." and lines[-1] == "TC ."
+    assert {line[0] for line in lines[1:-1]} == {"A", "D"}
+    added = "".join(line[2:] + "\n" for line in lines if line.startswith("A "))
+    assert len(Graph().parse(data=added, format="nt")) == sum(
+        line.startswith("A ") for line in lines
+    )
+
+
+def test_delta_of_parsed_versions():
+    migrated = MIGRATIONS["column added"]
+
+    delta = sql2shacl.diff(DDL(PAPER_EXAMPLE), DDL(migrated), mode="thapa")
+
+    assert delta == sql2shacl.diff(PAPER_EXAMPLE, migrated, mode="thapa")
+
+
+def test_diff_leaves_the_given_versions_as_they_are():
+    old_sql = (
+        "CREATE TABLE S (a integer, b integer, PRIMARY KEY (a), UNIQUE (b));\n"
+        "CREATE TABLE T (c integer, PRIMARY KEY (c));\n"
+        "CREATE TABLE U (d integer, e varchar);"
+    )
+    new_sql = old_sql.replace("e varchar", "e varchar NOT NULL")
+    old_ddl = DDL(old_sql)
+    ConstraintRewriter(
+        old_ddl, create_iri_builder("w3c", "http://example.org/")
+    ).rewrite()
+
+    first = sql2shacl.diff(old_ddl, new_sql)
+    second = sql2shacl.diff(old_ddl, new_sql)
+
+    assert first.reshaped == ("U",)
+    assert first == second == sql2shacl.diff(old_sql, new_sql)
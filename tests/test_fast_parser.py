@@ -0,0 +1,115 @@
+import glob
+import re
+import pytest
+from sqlparse import keywords, lexer, tokens
+from sqlparse.engine.statement_splitter import StatementSplitter
+from sql2shacl.sql import fast_parser
+from sql2shacl.sql.ddl import DDL
+
+CORPUS = sorted(glob.glob("testcases/*/create.sql")) + ["tests/ddl/paper_example.sql"]
+
+VARIANTS = [
+    'CREATE TABLE "Emp Table" ("E id" integer PRIMARY KEY, "Name" varchar(50) NOT NULL)',
+    "create table emp (id int primary key, salary double precision, note character varying(20))",
+    "CREATE TABLE public.emp (id integer, CONSTRAINT emp_pk PRIMARY KEY (id));",
+    "CREATE TEMPORARY TABLE t (a integer UNIQUE, b integer, UNIQUE (a, b))",
+    "CREATE TABLE Emp(a integer)",
+    "CREATE TABLE emp -- comment\n (a integer)",
+    "CREATE TABLE emp (a integer) -- comment\n;",
+    "CREATE TABLE emp (\n  a integer, -- first\n  b integer -- last\n);",
+    "CREATE TABLE emp (a integer /* inline */ NOT NULL, b numeric(10, 2) DEFAULT 0.5)",
+    "CREATE TABLE emp (a integer DEFAULT 'x''y', b boolean DEFAULT now()::boolean)",
+    "CREATE TABLE emp (a integer) WITH (fillfactor = 70)",
+    "CREATE TABLE IF NOT EXISTS emp (a integer)",
+    "CREATE UNLOGGED TABLE emp (a integer)",
+    "CREATE TABLE asg (e integer, p integer, FOREIGN KEY (e, p) REFERENCES other (x, y))",
+    "CREATE FUNCTION f() RETURNS int AS $$ BEGIN RETURN 1; END; $$ LANGUAGE plpgsql;",
+    "CREATE TABLE a (x integer);\n-- trailing\nCREATE TABLE b (y integer);  \n\n",
+    "CREATE TABLE a (x integer);\nCREATE PROCEDURE p() BEGIN SELECT 1; END;\nCREATE TABLE b (y integer);",
+]
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+SCRIPTS = [_read(path) for path in CORPUS] + VARIANTS
+
+
+def _details(ddl: DDL):
+    return {
+        rel_name: [[(tkn.ttype, tkn.value) for tkn in expr] for expr in expressions]
+        for rel_name, expressions in ddl.relation_details.items()
+    }
+
+
+@pytest.mark.parametrize("sql", SCRIPTS)
+def test_tokenize_matches_sqlparse_lexer(sql):
+    assert list(fast_parser.tokenize(sql)) == list(lexer.tokenize(sql))
+
+
+@pytest.fixture
+def default_lexer():
+    lex = lexer.Lexer.get_default_instance()
+    yield lex
+    lex.default_initialization()
+
+
+def test_tokenize_follows_a_customized_lexer(default_lexer):
+    sql = "CREATE TABLE emp (a integer @@ tenant, b SERIALIZE)"
+    default_lexer.set_SQL_REGEX(
+        [(r"@@\s*\w+", tokens.Name.Builtin), *keywords.SQL_REGEX]
+    )
+    default_lexer.add_keywords({"SERIALIZE": tokens.Keyword})
+
+    tokenized = list(fast_parser.tokenize(sql))
+
+    assert tokenized == list(lexer.tokenize(sql))
+    assert (tokens.Name.Builtin, "@@ tenant") in tokenized
+    assert (tokens.Keyword, "SERIALIZE") in tokenized
+
+
+def test_tokenize_falls_back_to_a_lexer_it_cannot_join(default_lexer):
+    sql = "CREATE TABLE emp (tenant integer, Tenant integer)"
+    # matched case-sensitively, unlike the regexes of `set_SQL_REGEX`
+    default_lexer._SQL_REGEX.insert(0, (re.compile(r"tenant\b").match, tokens.Literal))
+
+    tokenized = list(fast_parser.tokenize(sql))
+
+    assert tokenized == list(lexer.tokenize(sql))
+    assert (tokens.Literal, "tenant") in tokenized
+    assert (tokens.Name, "Tenant") in tokenized
+
+
+@pytest.mark.parametrize("sql", SCRIPTS)
+def test_split_statements_matches_sqlparse_splitter(sql):
+    def statements(stmts):
+        return [[(tkn.ttype, tkn.value) for tkn in stmt.tokens] for stmt in stmts]
+
+    expected = statements(StatementSplitter().process(lexer.tokenize(sql)))
+
+    assert (
+        statements(fast_parser.split_statements(fast_parser.tokenize(sql))) == expected
+    )
+
+
+@pytest.mark.parametrize("path", CORPUS)
+def test_fast_path_matches_sqlparse_on_corpus(path):
+    sql = _read(path)
+
+    assert _details(DDL(sql, fast_path=True, keep_parsed=True)) == _details(
+        DDL(sql, fast_path=False, keep_parsed=True)
+    )
+
+
+@pytest.mark.parametrize("sql", VARIANTS)
+def test_fast_path_matches_sqlparse_on_variants(sql):
+    try:
+        expected = _details(DDL(sql, fast_path=False, keep_parsed=True))
+    except Exception as e:
+        with pytest.raises(type(e)):
+            DDL(sql, fast_path=True)
+        return
+
+    assert _details(DDL(sql, fast_path=True, keep_parsed=True)) == expected
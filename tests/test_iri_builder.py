@@ -0,0 +1,60 @@
+import pytest
+from rdflib import URIRef
+from sql2shacl.shacl.iri_builder import IRISafe, SequedaBuilder, W3CBuilder
+from sql2shacl.utils.exceptions import UnsupportedSQLDatatypeException
+
+BASE = "http://example.com/base/"
+
+
+@pytest.mark.parametrize(
+    "string, expected",
+    [
+        ("Emp_id", "Emp_id"),
+        ("a-b.c~d", "a-b.c~d"),
+        ("Äbc東京", "Äbc東京"),
+        ("a b", "a%20b"),
+        ("a#b,c/d", "a%23b%2Cc%2Fd"),
+        ("", ""),
+    ],
+)
+def test_iri_safe(string, expected):
+    assert IRISafe.iri_safe(string) == expected
+
+
+@pytest.mark.parametrize("builder_cls", [SequedaBuilder, W3CBuilder])
+def test_cached_iris_equal_built_iris(builder_cls):
+    builder = builder_cls(BASE)
+    calls = [
+        ("build_class_iri", ("My Table",)),
+        ("build_attribute_iri", ("My Table", "col#1")),
+        ("build_datatype_iri", ("varchar",)),
+        ("build_foreign_key_iri", ("Emp", "Dept", ["deptno", "x y"], ["id", "k"])),
+    ]
+
+    first = [getattr(builder, name)(*args) for name, args in calls]
+    second = [getattr(builder, name)(*args) for name, args in calls]
+    uncached = [
+        getattr(builder_cls(BASE, cache_size=0), name)(*args) for name, args in calls
+    ]
+
+    assert first == second == uncached
+    assert first[0] == URIRef(BASE + "My%20Table")
+    assert first[1] == URIRef(BASE + "My%20Table#col%231")
+
+
+def test_iri_cache_is_bounded():
+    builder = W3CBuilder(BASE, cache_size=2)
+    for idx in range(10):
+        builder.build_class_iri(f"t_{idx}")
+
+    assert len(builder._iri_cache) == 2
+    assert builder.build_class_iri("t_0") == URIRef(BASE + "t_0")
+
+
+def test_unsupported_datatype_is_not_cached():
+    builder = W3CBuilder(BASE)
+    for _ in range(2):
+        with pytest.raises(UnsupportedSQLDatatypeException):
+            builder.build_datatype_iri("nodatatype")
+
+    assert not builder._iri_cache
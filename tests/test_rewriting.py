@@ -1,8 +1,17 @@
+import io
 import os
+import subprocess
+import sys
 import pytest
 import logging
 import sql2shacl
-from rdflib import Graph
+from sql2shacl.constraint_rewriter import ConstraintRewriter
+from sql2shacl.shacl.iri_builder import W3CBuilder
+from sql2shacl.shacl.shacl_provider import Data, InvProp, Prop, ShapeContext
+from sql2shacl.shacl.shacl_shaper import Shaper, _unique_component_triples
+from sql2shacl.shacl.triple_buffer import TripleBuffer
+from sql2shacl.sql.ddl import DDL
+from rdflib import Graph, URIRef
 from rdflib.compare import isomorphic
 from rdflib.namespace import SH
 
@@ -82,3 +91,231 @@ def test_sql2shacl_thapa_example():
     actual_shapes_graph = os.path.join("tests", "shacl", "paper_example.ttl")
 
     shape_up_and_compare(create_sql, actual_shapes_graph, mode="thapa")
+
+
+def test_shaper_writes_into_the_rewriters_buffer():
+    rewriter = ConstraintRewriter.setup(
+        "CREATE TABLE Emp (id integer PRIMARY KEY, boss integer REFERENCES Emp (id));"
+    )
+    shapes = rewriter.shapes
+
+    rewriter.rewrite()
+
+    assert rewriter.shapes is shapes
+    assert isinstance(shapes, TripleBuffer) and len(shapes) > 0
+    assert (None, SH.maxCount, None) in rewriter.shapes_graph
+    assert rewriter.get_shapes() is rewriter.shapes_graph is rewriter.shapes
+    assert set(rewriter.shapes_graph) == set(shapes)
+
+
+def test_shapes_graph_keeps_the_shapes_of_later_rewrites():
+    rewriter = ConstraintRewriter.setup("CREATE TABLE t (a integer);")
+    shapes_graph = rewriter.shapes_graph
+    assert len(shapes_graph) == 0
+
+    rewriter.rewrite()
+
+    assert rewriter.shapes_graph is shapes_graph
+    assert (None, SH.maxCount, None) in shapes_graph
+
+
+@pytest.mark.parametrize("format", ["ttl", "turtle", "xml", "nt"])
+def test_changes_to_the_shapes_graph_are_serialized(format):
+    rewriter = ConstraintRewriter.setup("CREATE TABLE t (a integer);")
+    rewriter.rewrite()
+    a, b, c = URIRef("urn:a"), URIRef("urn:b"), URIRef("urn:c")
+
+    rewriter.get_shapes().add((a, b, c))
+    rewriter.get_shapes().remove((None, SH.maxCount, None))
+
+    shapes = Graph().parse(data=rewriter.serialize_shapes(format), format=format)
+    assert (a, b, c) in shapes
+    assert (None, SH.maxCount, None) not in shapes
+    assert isomorphic(shapes, rewriter.shapes_graph)
+
+
+def test_shapes_graph_can_be_assigned():
+    rewriter = ConstraintRewriter.setup("CREATE TABLE t (a integer UNIQUE);")
+    rewriter.rewrite()
+    n_shapes = len(rewriter.shapes)
+    other = Graph()
+    other.add((URIRef("urn:a"), URIRef("urn:b"), URIRef("urn:c")))
+
+    rewriter.shapes_graph += other
+
+    assert len(rewriter.shapes) == len(rewriter.shapes_graph) == n_shapes + 1
+    assert "<urn:c>" in rewriter.serialize_shapes()
+
+
+def test_triple_buffer_keeps_order_and_drops_duplicates():
+    a, b, c = URIRef("urn:a"), URIRef("urn:b"), URIRef("urn:c")
+    buffer = TripleBuffer()
+
+    buffer.add((c, b, a))
+    buffer.addN([(a, b, c, None), (c, b, a, None)])
+    buffer.add((a, b, c))
+
+    assert list(buffer) == [(c, b, a), (a, b, c)]
+    assert (a, b, c) in buffer and (b, b, b) not in buffer
+    assert set(buffer.to_graph()) == {(c, b, a), (a, b, c)}
+
+
+def test_blank_node_registries_are_scoped_to_a_run():
+    sql = "CREATE TABLE Emp (id integer PRIMARY KEY, boss integer REFERENCES Emp (id));"
+
+    runs = []
+    for _ in range(2):
+        rewriter = ConstraintRewriter.setup(sql)
+        rewriter.rewrite()
+        runs.append(set(rewriter.shapes_graph.subjects(SH.path, None)))
+
+    assert not runs[0] & runs[1]
+    assert not hasattr(Prop, "_b_nodes") and not hasattr(Data, "_b_nodes")
+
+    ctx = ShapeContext()
+    InvProp.shape(ctx, URIRef("urn:a"), URIRef("urn:p"), URIRef("urn:b"))
+    assert ctx.prop_b_nodes == {}
+
+
+def test_equal_terms_of_a_run_are_one_object():
+    rewriter = ConstraintRewriter.setup(
+        "CREATE TABLE Dept (id integer NOT NULL, name varchar(10));"
+        "CREATE TABLE Emp (id integer NOT NULL, dept integer REFERENCES Dept (id));"
+    )
+    triples = []
+
+    class ListSink:
+        def addN(self, quads):
+            triples.extend((s, p, o) for s, p, o, _ in quads)
+
+    # without the IRI cache of the builder, every built IRI is a new object
+    iri_builder = W3CBuilder(rewriter.iri_builder.base, cache_size=0)
+    Shaper(iri_builder, rewriter.ddl_manager, ListSink()).shape_up()
+
+    terms = [term for triple in triples for term in triple]
+    assert len({id(term) for term in terms}) == len(set(terms))
+
+
+@pytest.mark.parametrize("mode", ["w3c", "thapa"])
+def test_streamed_runs_hold_the_registries_of_one_relation(mode):
+    sql = "".join(
+        f"CREATE TABLE t_{idx} (id integer PRIMARY KEY, a varchar UNIQUE, "
+        f"parent integer REFERENCES t_{max(idx - 1, 0)} (id));"
+        for idx in range(10)
+    )
+    rewriter = ConstraintRewriter.setup(sql, mode=mode)
+    sizes = []
+
+    class StreamingSink:
+        def addN(self, quads):
+            pass
+
+        def flush(self):
+            ctx = shaper._context
+            sizes.append(len(ctx.terms) + len(ctx.prop_b_nodes) + len(ctx.data_b_nodes))
+
+    shaper = Shaper(rewriter.iri_builder, rewriter.ddl_manager, StreamingSink())
+    shaper.shape_up()
+
+    assert len(sizes) == 10
+    assert max(sizes) == sizes[-1]
+    assert not shaper._context.terms
+
+
+def test_foreign_key_shapes_are_traced_only_at_debug_level(capsys, caplog):
+    sql = "CREATE TABLE Emp (id integer PRIMARY KEY, boss integer REFERENCES Emp (id));"
+
+    with caplog.at_level(logging.INFO, logger="sql2shacl.shacl.shacl_shaper"):
+        ConstraintRewriter.setup(sql).rewrite()
+    assert "maxCount" not in caplog.text
+
+    with caplog.at_level(logging.DEBUG, logger="sql2shacl.shacl.shacl_shaper"):
+        ConstraintRewriter.setup(sql).rewrite()
+    assert "maxCount" in caplog.text
+
+    assert capsys.readouterr().out == ""
+
+
+def test_rewrite_loads_package_resources_from_any_directory(tmp_path):
+    script = (
+        "import sql2shacl; "
+        "print(sql2shacl.rewrite('CREATE TABLE t (a integer UNIQUE, b integer UNIQUE);'))"
+    )
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert "UniqueValuesConstraintComponent" in result.stdout
+
+
+def test_unique_component_is_parsed_once_per_process():
+    sql = "CREATE TABLE t (a integer UNIQUE);"
+    for _ in range(3):
+        ConstraintRewriter.setup(sql).rewrite()
+
+    assert _unique_component_triples.cache_info().misses == 1
+
+
+@pytest.mark.parametrize("mode", ["w3c", "thapa"])
+@pytest.mark.parametrize("testcase_", TESTCASES)
+def test_ntriples_stream_matches_turtle(testcase_, mode):
+    with open(os.path.join("testcases", testcase_, "create.sql")) as f:
+        sql = f.read()
+
+    turtle = sql2shacl.rewrite(sql, mode=mode)
+    ntriples = sql2shacl.rewrite(sql, mode=mode, format="nt")
+
+    assert isomorphic(
+        Graph().parse(data=ntriples, format="nt"),
+        Graph().parse(data=turtle, format="ttl"),
+    )
+
+
+def test_ntriples_stream_does_not_build_the_shapes_graph(tmp_path):
+    rewriter = ConstraintRewriter.setup(
+        "CREATE TABLE t (a integer UNIQUE, b integer UNIQUE, UNIQUE (a, b));"
+    )
+    out_file = tmp_path / "shapes.nt"
+
+    assert rewriter.serialize_shapes(format="nt", destination=str(out_file)) is None
+
+    assert len(rewriter.shapes) == 0
+    shapes_graph = Graph().parse(out_file, format="nt")
+    assert (None, SH.select, None) in shapes_graph
+
+
+@pytest.mark.parametrize("mode", ["w3c", "thapa"])
+@pytest.mark.parametrize("testcase_", TESTCASES)
+def test_shapes_of_a_saved_model_match_the_script(testcase_, mode, tmp_path):
+    sql_path = os.path.join("testcases", testcase_, "create.sql")
+    model_file = str(tmp_path / "schema.model")
+    with open(sql_path, encoding="utf-8") as f:
+        sql = f.read()
+    DDL(sql).save(model_file)
+
+    rewriter = ConstraintRewriter.from_model(model_file, mode=mode)
+    rewriter.rewrite()
+
+    expected = Graph().parse(data=sql2shacl.rewrite(sql, mode=mode), format="ttl")
+    assert isomorphic(rewriter.get_shapes(), expected)
+
+
+def test_rewriting_leaves_a_loaded_model_as_it_is(tmp_path):
+    model_file = tmp_path / "schema.model"
+    DDL("CREATE TABLE t (a integer, b integer, PRIMARY KEY (a), UNIQUE (b));").save(
+        str(model_file)
+    )
+    ddl = DDL.load(str(model_file))
+
+    sql2shacl.rewrite(ddl)
+    saved = io.StringIO()
+    ddl.save(saved)
+
+    assert saved.getvalue() == model_file.read_text(encoding="utf-8")
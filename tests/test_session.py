@@ -0,0 +1,123 @@
+import asyncio
+import os
+import threading
+import pytest
+import sql2shacl
+import sql2shacl.session
+from concurrent.futures import ProcessPoolExecutor
+from rdflib import Graph
+from rdflib.compare import isomorphic
+from sql2shacl import RewriterSession
+from sql2shacl.utils.exceptions import (
+    MissingSQLDatatypeException,
+    RewriterBusyException,
+)
+
+SQL = "CREATE TABLE Emp (id integer PRIMARY KEY, boss integer REFERENCES Emp (id));"
+
+
+@pytest.mark.parametrize("mode", ["w3c", "thapa"])
+def test_session_rewrites_like_rewrite(mode):
+    with open(os.path.join("tests", "ddl", "paper_example.sql")) as f:
+        sql = f.read()
+    session = RewriterSession(base_iri="http://example.com/base/", mode=mode)
+
+    for _ in range(2):
+        assert isomorphic(
+            Graph().parse(data=session.rewrite(sql), format="ttl"),
+            Graph().parse(
+                data=sql2shacl.rewrite(sql, "http://example.com/base/", mode),
+                format="ttl",
+            ),
+        )
+
+
+def test_session_sets_up_logging_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        sql2shacl.session, "setup_logging", lambda *args: calls.append(args)
+    )
+
+    session = RewriterSession()
+    for format in ("ttl", "nt", "xml"):
+        assert session.rewrite(SQL, format=format)
+
+    assert len(calls) == 1
+
+
+def test_session_writes_to_destination(tmp_path):
+    out_file = tmp_path / "shapes.nt"
+    session = RewriterSession(format="nt", log_level=None)
+
+    assert session.rewrite(SQL, destination=str(out_file)) is None
+    assert len(Graph().parse(out_file, format="nt")) > 0
+
+
+def test_failed_rewrites_raise_their_error():
+    sql = "CREATE TABLE t (a);"
+
+    with pytest.raises(MissingSQLDatatypeException):
+        RewriterSession().rewrite(sql)
+
+    with pytest.raises(MissingSQLDatatypeException):
+        sql2shacl.rewrite(sql)
+
+
+def test_unknown_mode_is_rejected_up_front():
+    with pytest.raises(ValueError):
+        RewriterSession(mode="unknown")
+
+
+def test_arewrite_matches_rewrite():
+    async def main():
+        return await asyncio.gather(
+            sql2shacl.arewrite(SQL), RewriterSession(log_level=None).arewrite(SQL)
+        )
+
+    expected = Graph().parse(data=sql2shacl.rewrite(SQL), format="ttl")
+    for shapes in asyncio.run(main()):
+        assert isomorphic(Graph().parse(data=shapes, format="ttl"), expected)
+
+
+def test_arewrite_runs_in_a_process_executor():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        session = RewriterSession(log_level=None, format="nt", executor=executor)
+        shapes = asyncio.run(session.arewrite(SQL))
+
+    assert len(Graph().parse(data=shapes, format="nt")) > 0
+
+
+def test_arewrite_limits_concurrency_and_queue(monkeypatch):
+    session = RewriterSession(log_level=None, max_concurrency=2, max_queue=1)
+    release = threading.Event()
+    running = []
+
+    def rewrite(sql, format=None):
+        running.append(sql)
+        release.wait(timeout=5)
+        return sql
+
+    monkeypatch.setattr(session, "rewrite", rewrite)
+
+    async def main():
+        tasks = [asyncio.create_task(session.arewrite(f"{idx}")) for idx in range(3)]
+        await asyncio.sleep(0.1)
+
+        # two run, one waits for a slot, and a fourth call is turned away
+        assert sorted(running) == ["0", "1"]
+        with pytest.raises(RewriterBusyException):
+            await session.arewrite("3")
+
+        # the waiting call is dropped before it starts
+        tasks[2].cancel()
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert results[:2] == ["0", "1"]
+        assert isinstance(results[2], asyncio.CancelledError)
+        assert "2" not in running
+        assert await session.arewrite("4") == "4"
+
+    asyncio.run(main())
+    assert session._n_pending == 0
+    session.close()
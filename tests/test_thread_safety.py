@@ -0,0 +1,76 @@
+import logging
+import os
+import sys
+import pytest
+import sql2shacl
+from concurrent.futures import ThreadPoolExecutor
+from rdflib import Graph
+from rdflib.compare import isomorphic
+from sql2shacl import RewriterSession
+from sql2shacl.shacl.iri_builder import get_sqldtype_xmlschema_map
+from sql2shacl.utils import logging as cr_logging
+
+TESTCASES = sorted(
+    os.path.join("testcases", testcase_, "create.sql")
+    for testcase_ in os.listdir("testcases")
+    if os.path.isdir(os.path.join("testcases", testcase_))
+)
+
+
+@pytest.fixture
+def frequent_thread_switches():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_concurrent_rewrites_match_sequential_ones(frequent_thread_switches):
+    scripts = []
+    for path in TESTCASES:
+        with open(path, encoding="utf-8") as f:
+            scripts.append(f.read())
+
+    # small IRI caches, so that the threads also evict each other's IRIs
+    sessions = {
+        mode: RewriterSession(mode=mode, log_level=None) for mode in ("w3c", "thapa")
+    }
+    for session in sessions.values():
+        session.iri_builder.cache_size = 8
+
+    jobs = [(mode, sql) for _ in range(4) for mode in sessions for sql in scripts]
+    expected = {
+        (mode, sql): Graph().parse(data=sessions[mode].rewrite(sql), format="ttl")
+        for mode, sql in set(jobs)
+    }
+
+    def rewrite(job):
+        mode, sql = job
+        if len(sql) % 2:
+            return sql2shacl.rewrite(sql, mode=mode, log_level=logging.ERROR)
+
+        return sessions[mode].rewrite(sql)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(rewrite, jobs))
+
+    assert len(results) >= 200
+    for job, shapes in zip(jobs, results):
+        assert isomorphic(Graph().parse(data=shapes, format="ttl"), expected[job])
+
+
+def test_logging_is_configured_once_per_setting(monkeypatch):
+    calls = []
+    monkeypatch.setattr(cr_logging, "_current_settings", None)
+    monkeypatch.setattr(cr_logging, "dictConfig", calls.append)
+
+    for _ in range(3):
+        cr_logging.setup_logging(logging.ERROR)
+    cr_logging.setup_logging(logging.INFO)
+
+    assert len(calls) == 2
+
+
+def test_datatype_map_is_read_only():
+    with pytest.raises(TypeError):
+        get_sqldtype_xmlschema_map()["VARCHAR"] = "urn:x"
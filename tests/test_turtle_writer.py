@@ -0,0 +1,51 @@
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF, SH, XSD
+from sql2shacl.shacl.turtle_writer import TurtleWriter
+
+BASE = "http://example.com/base/"
+NAMESPACES = {"sh": SH, "rdf": RDF, "xsd": XSD, "base": BASE}
+
+
+def _round_trip(graph: Graph) -> Graph:
+    return Graph().parse(data=TurtleWriter(NAMESPACES).serialize(graph), format="ttl")
+
+
+@pytest.mark.parametrize(
+    "local",
+    ["Emp", "Emp#E_id", "Prj,Acc#ToAcc,A_id", "a%20b", "-a", "a.b", "a.", "Äb"],
+)
+def test_iris_survive_abbreviation(local):
+    graph = Graph()
+    graph.add((URIRef(BASE + local), RDF.type, SH.NodeShape))
+
+    assert isomorphic(_round_trip(graph), graph)
+
+
+def test_literals_and_blank_node_structures_round_trip():
+    graph = Graph()
+    shape, prop, shared, cycle_a, cycle_b = BNode(), BNode(), BNode(), BNode(), BNode()
+    graph.add((URIRef(BASE + "Emp"), SH.property, prop))
+    graph.add((prop, SH.maxCount, Literal(1)))
+    graph.add((prop, SH.select, Literal('SELECT "x"\n  WHERE { }\\')))
+    graph.add((prop, SH.name, Literal("name", lang="en")))
+    graph.add((prop, SH.datatype, Literal("1.5", datatype=XSD.decimal)))
+    graph.add((shape, SH.property, shared))
+    graph.add((URIRef(BASE + "Prj"), SH.property, shared))
+    graph.add((shared, SH.path, URIRef(BASE + "Prj#P_id")))
+    graph.add((cycle_a, SH.node, cycle_b))
+    graph.add((cycle_b, SH.node, cycle_a))
+
+    assert isomorphic(_round_trip(graph), graph)
+
+
+def test_only_used_prefixes_are_declared():
+    graph = Graph()
+    graph.add((URIRef(BASE + "Emp"), RDF.type, SH.NodeShape))
+
+    turtle = TurtleWriter(NAMESPACES).serialize(graph)
+
+    assert "@prefix base:" in turtle and "@prefix sh:" in turtle
+    assert "@prefix xsd:" not in turtle and "@prefix rdf:" not in turtle
+    assert "base:Emp a sh:NodeShape" in turtle